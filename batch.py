@@ -0,0 +1,62 @@
+"""Generating and solving many mazes in parallel across a pool of processes.
+
+Example:
+    jobs = [BatchJob(seed, (100, 100), "dfs", "bfs") for seed in range(1000)]
+    for result in solve_in_batch(jobs):
+        print(result.job.seed, result.path_length)
+"""
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from grid_block.compact_grid import CompactGrid
+from maze_building.registry import get_generating_algorithm
+from maze_solving.registry import get_solving_algorithm
+from maze_storage.maze_file import grid_from_bytes, grid_to_bytes
+
+# size is a tuple (no_of_columns, no_of_rows). maze is a maze serialized by grid_to_bytes() to be solved instead of
+# generating one, seed and generator are then only recorded in the result.
+BatchJob = namedtuple("BatchJob", ["seed", "size", "generator", "solver", "maze"], defaults=[None])
+# maze is the maze with the found path serialized by grid_to_bytes() if it was requested, None otherwise.
+BatchResult = namedtuple("BatchResult", ["job", "steps", "path_length", "seconds", "maze"])
+
+
+def run_job(job, include_maze=False):
+    """Generates (or deserializes) and solves a maze from the first to the last block in the current process."""
+    start_time = time.perf_counter()
+    if job.maze is not None:
+        grid = grid_from_bytes(job.maze)[0]
+    else:
+        no_of_columns, no_of_rows = job.size
+        grid = CompactGrid(no_of_columns, no_of_rows)
+        get_generating_algorithm(job.generator)(grid, random.Random(job.seed)).run()
+    solver = get_solving_algorithm(job.solver)(grid, grid[0], grid[-1])
+    path = solver.run()
+    seconds = time.perf_counter() - start_time
+    maze = grid_to_bytes(grid, job.seed, job.generator, [path]) if include_maze else None
+    return BatchResult(job, solver.steps_taken, len(path), seconds, maze)
+
+
+def run_jobs(jobs, include_maze=False):
+    """Used by worker processes to run a chunk of jobs at once."""
+    return [run_job(job, include_maze) for job in jobs]
+
+
+def solve_in_batch(jobs, max_workers=None, chunk_size=8, include_mazes=False):
+    """Runs jobs (BatchJob tuples) across a ProcessPoolExecutor and yields a BatchResult for every job
+    as soon as its chunk completes, so results don't come in the order of jobs.
+    Jobs are sent to workers in chunks of chunk_size to keep the cost of passing them between processes low.
+    Mazes travel between processes only as compact buffers serialized by grid_to_bytes()."""
+    jobs = list(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_jobs, jobs[start:start + chunk_size], include_mazes)
+                   for start in range(0, len(jobs), chunk_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def create_maze_jobs(grids, solver, seed=None, generator=""):
+    """Creates jobs solving already generated grids, serialized so they can be passed to worker processes."""
+    return [BatchJob(seed, (grid[-1].x_index + 1, grid[-1].y_index + 1), generator, solver, grid_to_bytes(grid))
+            for grid in grids]
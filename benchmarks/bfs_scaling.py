@@ -0,0 +1,57 @@
+"""Measures how Breadth First Search scales with the number of blocks.
+Solves open grids (only the outer walls are present), which give BFS the largest possible frontier,
+from the top left to the bottom right block. Time per block should stay roughly constant.
+
+Example:
+    python benchmarks/bfs_scaling.py --max-blocks 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid_block.compact_grid import CompactGrid, WALL_N, WALL_E, WALL_S, WALL_W  # noqa: E402
+from maze_solving.bfs import BreadthFirstSearch  # noqa: E402
+
+
+def create_open_grid(no_of_columns, no_of_rows):
+    """Creates a grid without any inner walls."""
+    grid = CompactGrid(no_of_columns, no_of_rows, walls=bytearray(no_of_columns * no_of_rows))
+    walls = grid.walls
+    last_row = (no_of_rows - 1) * no_of_columns
+    for x in range(no_of_columns):
+        walls[x] |= WALL_N
+        walls[last_row + x] |= WALL_S
+    for y in range(no_of_rows):
+        walls[y * no_of_columns] |= WALL_W
+        walls[y * no_of_columns + no_of_columns - 1] |= WALL_E
+    return grid
+
+
+def measure(side):
+    grid = create_open_grid(side, side)
+    start_time = time.perf_counter()
+    bfs = BreadthFirstSearch(grid, grid[0], grid[-1])
+    path = bfs.run()
+    elapsed = time.perf_counter() - start_time
+    return bfs.steps_taken, len(path), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-blocks", type=int, default=10 ** 7, help="largest number of blocks to measure")
+    args = parser.parse_args()
+
+    print(f"{'blocks':>12} {'steps':>12} {'path':>8} {'seconds':>9} {'ns/step':>8}")
+    blocks = 10 ** 4
+    while blocks <= args.max_blocks:
+        side = round(blocks ** 0.5)
+        steps, path_length, elapsed = measure(side)
+        print(f"{side * side:>12} {steps:>12} {path_length:>8} {elapsed:>9.3f} {elapsed / steps * 1e9:>8.0f}")
+        blocks *= 10
+
+
+if __name__ == "__main__":
+    main()
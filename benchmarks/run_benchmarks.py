@@ -0,0 +1,154 @@
+"""Benchmarks generating and solving algorithms on seeded mazes of growing size.
+For every size, seed, generating algorithm and solving algorithm records wall-clock time, peak memory
+allocated by Python (tracemalloc), the number of steps made (expanded nodes for solving algorithms)
+and the length of the path found, and writes them to a JSON file.
+Time and memory are measured in separate runs, as tracemalloc slows the measured code down.
+The best time of --repeat runs is recorded to reduce noise.
+Passing --baseline compares the results with an earlier JSON file and exits with status 1
+if any time got worse than the given tolerance.
+
+Example:
+    python benchmarks/run_benchmarks.py --max-size 1024 --output results.json
+    python benchmarks/run_benchmarks.py --max-size 1024 --output new.json --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grid_block.compact_grid import CompactGrid  # noqa: E402
+from maze_building.registry import GENERATING_ALGORITHMS  # noqa: E402
+from maze_solving.registry import SOLVING_ALGORITHMS  # noqa: E402
+
+SIZES = (10, 32, 100, 316, 1024, 4096)  # Mazes are square, so the number of blocks grows roughly tenfold
+
+
+def measure(function, track_memory):
+    """Calls function and returns its result, elapsed seconds and peak memory in bytes (None if not tracked)."""
+    if track_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start_time
+    peak_memory = None
+    if track_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak_memory
+
+
+def generate(generator, size, seed):
+    algorithm = GENERATING_ALGORITHMS[generator](CompactGrid(size, size), random.Random(seed))
+    return algorithm, algorithm.run()
+
+
+def solve(solver, grid):
+    algorithm = SOLVING_ALGORITHMS[solver](grid, grid[0], grid[-1])
+    return algorithm, algorithm.run()
+
+
+def best_of(repeat, function):
+    """Measures function repeat times. Returns the result and the best elapsed seconds."""
+    result, seconds, _ = measure(function, False)
+    for _ in range(repeat - 1):
+        seconds = min(seconds, measure(function, False)[1])
+    return result, seconds
+
+
+def benchmark(sizes, seeds, generators, solvers, track_memory, repeat, log):
+    results = []
+    for size in sizes:
+        for seed in seeds:
+            for generator in generators:
+                (algorithm, grid), seconds = best_of(repeat, lambda: generate(generator, size, seed))
+                peak_memory = measure(lambda: generate(generator, size, seed), True)[2] if track_memory else None
+                results.append({"kind": "generator", "algorithm": generator, "size": size, "blocks": size * size,
+                                "seed": seed, "seconds": seconds, "peak_memory": peak_memory,
+                                "steps": algorithm.steps_taken, "path_length": None})
+                log(results[-1])
+                for solver in solvers:
+                    (algorithm, path), seconds = best_of(repeat, lambda: solve(solver, grid))
+                    peak_memory = measure(lambda: solve(solver, grid), True)[2] if track_memory else None
+                    results.append({"kind": "solver", "algorithm": solver, "generator": generator, "size": size,
+                                    "blocks": size * size, "seed": seed, "seconds": seconds,
+                                    "peak_memory": peak_memory, "steps": algorithm.steps_taken,
+                                    "path_length": len(path)})
+                    log(results[-1])
+    return results
+
+
+def result_key(result):
+    return result["kind"], result["algorithm"], result.get("generator"), result["size"], result["seed"]
+
+
+def compare(results, baseline_results, tolerance):
+    """Prints results slower than the baseline by more than tolerance (e.g. 0.2 for 20%).
+    Returns the number of such regressions."""
+    baseline = {result_key(result): result for result in baseline_results}
+    regressions = 0
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if ratio > 1 + tolerance:
+            regressions += 1
+            print(f"REGRESSION {' '.join(str(part) for part in result_key(result) if part is not None)}: "
+                  f"{old['seconds']:.4f} s -> {result['seconds']:.4f} s ({ratio:.2f}x)")
+        if old["steps"] != result["steps"]:
+            print(f"CHANGED STEPS {' '.join(str(part) for part in result_key(result) if part is not None)}: "
+                  f"{old['steps']} -> {result['steps']}")
+    return regressions
+
+
+def print_result(result):
+    memory = f"{result['peak_memory'] / 2 ** 20:9.2f} MiB" if result["peak_memory"] is not None else ""
+    path_length = result["path_length"] if result["path_length"] is not None else ""
+    print(f"{result['kind']:>9} {result['algorithm']:>11} {result['size']:>5} {result['seed']:>4} "
+          f"{result['seconds']:>10.4f} s {result['steps']:>10} {path_length:>8} {memory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of columns (and rows)")
+    parser.add_argument("--max-size", type=int, default=None, help="skip sizes larger than this one")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1], help="seeds of generated mazes")
+    parser.add_argument("--generators", nargs="+", choices=sorted(GENERATING_ALGORITHMS), default=["dfs"])
+    parser.add_argument("--solvers", nargs="+", choices=sorted(SOLVING_ALGORITHMS), default=list(SOLVING_ALGORITHMS))
+    parser.add_argument("--repeat", type=int, default=1, help="number of timed runs, the best one is recorded")
+    parser.add_argument("--no-memory", action="store_true", help="don't measure peak memory")
+    parser.add_argument("--output", default="benchmark_results.json", help="path of the JSON file with results")
+    parser.add_argument("--baseline", default=None, help="JSON file with earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown compared to the baseline")
+    args = parser.parse_args()
+
+    sizes = [size for size in args.sizes if args.max_size is None or size <= args.max_size]
+    print(f"{'kind':>9} {'algorithm':>11} {'size':>5} {'seed':>4} {'time':>12} {'steps':>10} {'path':>8} {'memory'}")
+    results = benchmark(sizes, args.seeds, args.generators, args.solvers, not args.no_memory, args.repeat,
+                        print_result)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
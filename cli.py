@@ -0,0 +1,123 @@
+"""Headless maze generation and solving.
+Imports only the grid, maze_building, maze_solving, maze_storage and instrumentation modules,
+so pygame and SDL are never loaded.
+
+Example:
+    python cli.py --columns 30 --rows 20 --seed 1 --generator kruskal --algorithm a_star --output maze.txt
+    python cli.py --columns 1000 --rows 1000000 --seed 1 --stream --output huge.maze
+    python cli.py --input huge.maze --algorithm bfs --output solution.txt
+"""
+import argparse
+import random
+import sys
+
+from grid_block.compact_grid import CompactGrid
+from instrumentation import Metrics, instrument
+from maze_building.braid import braid
+from maze_building.registry import GENERATING_ALGORITHMS, get_generating_algorithm
+from maze_solving.registry import SOLVING_ALGORITHMS, get_solving_algorithm
+from maze_storage.mapped_grid import MappedGrid
+from maze_storage.maze_file import write_grid, stream_maze_to_file
+
+
+def generate_maze(no_of_columns, no_of_rows, seed=None, generator="dfs", metrics=None):
+    """Generates a maze using the chosen generating algorithm without visualization.
+    The algorithm is measured if metrics (see instrumentation.Metrics) are given."""
+    grid = CompactGrid(no_of_columns, no_of_rows)
+    return instrument(get_generating_algorithm(generator)(grid, random.Random(seed)), metrics).run()
+
+
+def solve_maze(grid, algorithm, metrics=None):
+    """Solves a maze from the first to the last block. Returns the solving algorithm and the path found.
+    The algorithm is measured if metrics (see instrumentation.Metrics) are given."""
+    solver = instrument(get_solving_algorithm(algorithm)(grid, grid[0], grid[-1]), metrics)
+    return solver, solver.run()
+
+
+def render_maze(grid, path=None):
+    """Renders a maze as text. Blocks being part of the path are marked with an asterisk."""
+    no_of_columns = grid[-1].x_index + 1
+    no_of_rows = grid[-1].y_index + 1
+    path_indices = {block.indices for block in path} if path else set()
+    lines = []
+    for y in range(no_of_rows):
+        row = [grid[y * no_of_columns + x] for x in range(no_of_columns)]
+        lines.append("+" + "".join("---+" if block.wall.n else "   +" for block in row))
+        cells = "|" if row[0].wall.w else " "
+        for block in row:
+            cells += " * " if block.indices in path_indices else "   "
+            cells += "|" if block.wall.e else " "
+        lines.append(cells)
+    last_row = [grid[(no_of_rows - 1) * no_of_columns + x] for x in range(no_of_columns)]
+    lines.append("+" + "".join("---+" if block.wall.s else "   +" for block in last_row))
+    return "\n".join(lines) + "\n"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate and solve a maze without a graphical interface.")
+    parser.add_argument("--columns", type=int, default=30, help="number of columns of a generated grid")
+    parser.add_argument("--rows", type=int, default=20, help="number of rows of a generated grid")
+    parser.add_argument("--seed", type=int, default=None, help="seed used to generate a maze")
+    parser.add_argument("--generator", choices=sorted(GENERATING_ALGORITHMS), default=None,
+                        help="algorithm used to generate a maze, dfs by default")
+    parser.add_argument("--algorithm", choices=sorted(SOLVING_ALGORITHMS), default=None,
+                        help="algorithm used to solve a maze, the maze is only generated if omitted")
+    parser.add_argument("--output", default="-",
+                        help="path of the output file, '-' writes to stdout, a path ending with .maze writes "
+                             "a binary maze file (see maze_storage.maze_file) storing the path found too")
+    parser.add_argument("--braid", type=float, default=0.0, metavar="RATIO",
+                        help="remove this share of dead ends of a generated maze to create loops (0.0 to 1.0)")
+    parser.add_argument("--input", default=None, help="path of a binary maze file to solve instead of generating one")
+    parser.add_argument("--metrics", default=None,
+                        help="path of a file to write metrics of generating and solving to, "
+                             "as CSV if it ends with .csv and as JSON otherwise")
+    parser.add_argument("--stream", action="store_true",
+                        help="generate a maze with Eller's algorithm row by row straight into a binary maze file, "
+                             "keeping only one row in memory; the maze can't be solved or braided, so it can't be "
+                             "combined with --algorithm, --braid, --input, --metrics or a --generator other than eller")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics = Metrics() if args.metrics is not None else None
+    if args.stream:
+        if not args.output.endswith(".maze"):
+            raise SystemExit("--stream requires --output ending with .maze")
+        if args.generator not in (None, "eller"):
+            raise SystemExit(f"--stream always generates a maze with eller, it can't be used with --generator "
+                             f"{args.generator}")
+        for option, value in (("--algorithm", args.algorithm), ("--braid", args.braid), ("--input", args.input),
+                              ("--metrics", args.metrics)):
+            if value:
+                raise SystemExit(f"--stream writes the maze straight to the file, it can't be used with {option}")
+        stream_maze_to_file(args.output, args.columns, args.rows, args.seed)
+        return
+    args.generator = args.generator or "dfs"
+    if args.input is not None:
+        grid = MappedGrid(args.input)  # Walls are read in place from the memory-mapped file
+        args.seed, args.generator = grid.header.seed, grid.header.generator
+    else:
+        grid = generate_maze(args.columns, args.rows, args.seed, args.generator, metrics)
+        if args.braid:
+            braid(grid, args.braid, random.Random(args.seed))
+    path = None
+    if args.algorithm is not None:
+        solver, path = solve_maze(grid, args.algorithm, metrics)
+        print(f"The maze was solved by {args.algorithm} in {solver.steps_taken} steps, "
+              f"the path has {len(path)} blocks.", file=sys.stderr)
+    if metrics is not None:
+        metrics.write(args.metrics)
+    if args.output.endswith(".maze"):
+        write_grid(args.output, grid, args.seed, args.generator, [path] if path else ())
+        return
+    text = render_maze(grid, path)
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
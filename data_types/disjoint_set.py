@@ -0,0 +1,31 @@
+from array import array
+
+
+class DisjointSet:
+    """Used in Kruskal's and Eller's algorithms to keep track of blocks connected by a path.
+    Elements are integers from 0 to size - 1. Union by size and path halving keep find() almost constant."""
+    def __init__(self, size):
+        typecode = "i" if size < 2 ** 31 else "q"
+        self.parents = array(typecode, range(size))
+        self.sizes = array(typecode, [1]) * size
+
+    def find(self, item):
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, item, other_item):
+        """Joins sets of both items. Returns False if they already were in the same set."""
+        root, other_root = self.find(item), self.find(other_item)
+        if root == other_root:
+            return False
+        if self.sizes[root] < self.sizes[other_root]:
+            root, other_root = other_root, root
+        self.parents[other_root] = root
+        self.sizes[root] += self.sizes[other_root]
+        return True
+
+    def __len__(self):
+        return len(self.parents)
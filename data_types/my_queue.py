@@ -1,7 +1,11 @@
+from collections import deque
+
+
 class Queue:
-    """Used in BFS to enqueue element to the queue and to dequeue the last element."""
+    """Used in BFS to enqueue element to the queue and to dequeue the first element.
+    Backed by collections.deque, so both enqueue and dequeue take O(1) time."""
     def __init__(self):
-        self.items = []
+        self.items = deque()
 
     def is_empty(self):
         return not self.items
@@ -10,7 +14,7 @@ class Queue:
         self.items.append(item)
 
     def dequeue(self):
-        return self.items.pop(0)
+        return self.items.popleft()
 
     def size(self):
         return len(self.items)
@@ -19,4 +23,4 @@ class Queue:
         return self.items[index]
 
     def __str__(self):
-        return str(self.items)
+        return str(list(self.items))
@@ -1,4 +1,5 @@
 import heapq
+from array import array
 
 
 class PriorityQueue:
@@ -17,3 +18,63 @@ class PriorityQueue:
 
     def __str__(self):
         return str(self.elements)
+
+
+class AStarOpenSet:
+    """Used in A* as the open set of blocks given by their grid indices.
+    Entries are tuples of integers (f value, h value, insertion counter, grid index), so heapq compares them in C
+    without calling __lt__ of a block. Ties of f values are broken by the lower h value (closer to the goal)
+    and then by insertion order, which makes the order of expanding blocks the same on every run.
+    Decreasing the priority is lazy: putting a block again leaves its old entry in the heap
+    and get() skips such stale entries."""
+    def __init__(self, size):
+        self.elements = []
+        self.counter = 0
+        self.live_elements = 0
+        # Stores at the grid index the insertion counter of the only valid entry of that block, 0 means no entry.
+        self.valid_entries = array("q", [0]) * size
+
+    def __len__(self):
+        return self.live_elements
+
+    def is_empty(self):
+        return not self.live_elements
+
+    def put(self, index, f_value, h_value):
+        self.counter += 1
+        if not self.valid_entries[index]:
+            self.live_elements += 1
+        self.valid_entries[index] = self.counter
+        heapq.heappush(self.elements, (f_value, h_value, self.counter, index))
+
+    def get(self):
+        """Removes and returns the grid index with the lowest (f value, h value, insertion counter)."""
+        elements, valid_entries = self.elements, self.valid_entries
+        while elements:
+            _, _, counter, index = heapq.heappop(elements)
+            if valid_entries[index] == counter:
+                valid_entries[index] = 0
+                self.live_elements -= 1
+                return index
+        raise IndexError("get from an empty open set")
+
+    def clear(self):
+        """Removes all entries in time proportional to their number, so the open set can be reused."""
+        valid_entries = self.valid_entries
+        for element in self.elements:
+            valid_entries[element[3]] = 0
+        self.elements.clear()
+        self.live_elements = 0
+
+    def peek_f_value(self):
+        """Returns the lowest f value in the open set without removing its entry, dropping stale entries on top."""
+        elements, valid_entries = self.elements, self.valid_entries
+        while elements:
+            f_value, _, counter, index = elements[0]
+            if valid_entries[index] == counter:
+                return f_value
+            heapq.heappop(elements)
+        raise IndexError("peek from an empty open set")
+
+    def __str__(self):
+        return str([element for element in self.elements if self.valid_entries[element[3]] == element[2]])
@@ -1,15 +1,28 @@
 import pygame
 import os
 
-from grid_block.block import Block
-from maze_building.build_dfs import RandomizedDepthFirstSearch
+from grid_block.compact_grid import CompactGrid
+from grid_renderer import GridRenderer
+from instrumentation import Metrics, instrument
+from maze_building.braid import braid
+from maze_building.registry import GENERATING_ALGORITHMS
 from maze_solving.dfs import DepthFirstSearch
 from maze_solving.bfs import BreadthFirstSearch
 from maze_solving.a_star import AStar
+from maze_solving.bidirectional import BidirectionalBreadthFirstSearch, BidirectionalAStar
+from maze_solving.jump_point_search import JumpPointSearch
+from recording import Recorder, Player
+from stepping import FrameScheduler
 
 OFFSET_X, OFFSET_Y = 10, 10  # To offset the whole grid by x and y pixels.
 BLOCK_SIZE = 40  # Size of a grid block.
 GRID_COLUMNS, GRID_ROWS = 30, 20  # Number of columns and rows of a generated grid.
+GENERATING_ALGORITHM = "dfs"  # Name of the algorithm used to generate a maze, see maze_building.registry.
+STEPS_PER_FRAME = 1  # Maximum number of algorithm steps made every frame when generating or solving a maze.
+FRAME_RATE = 60  # Frames per second.
+STEP_BUDGET_MS = 8  # Milliseconds of every frame algorithms can step for, the rest is left for drawing and events.
+METRICS_FILE = None  # Path of a JSON or CSV file to write metrics of algorithms to on exit, None turns metrics off.
+RECORD_RUNS = True  # Records the last generating or solving run, so it can be replayed, see recording.py.
 
 
 class Game:
@@ -27,52 +40,55 @@ class Game:
         self.clock = pygame.time.Clock()
 
         self.grid = None
+        self.renderer = None  # Redraws only blocks changed since the last frame
         self.show_visited_revisited = True  # Used when generating and solving a maze to visualise process
         self.show_path = False  # Used to show/hide the shortest path created when building a maze
         self.is_grid_created = False
         self.is_maze_generated = False
         self.chosen_solving_algorithm = None
+        self.generating_algorithm = GENERATING_ALGORITHM
         self.algorithm = None
-        self.iteration_counter = 0
+        self.steps_per_frame = STEPS_PER_FRAME
+        self.scheduler = FrameScheduler(STEP_BUDGET_MS)  # Keeps the frame rate when many steps are made per frame
+        self.metrics = Metrics() if METRICS_FILE is not None else None
+        self.recorder = None  # Records the last generating or solving run
+        self.player = None  # Replays the last recorded run
+        self.is_replay_paused = False
 
     def create_grid(self, number_of_columns=10, number_of_rows=10):
-        self.grid = [Block(x, y) for y in range(number_of_rows) for x in range(number_of_columns)]
+        self.grid = CompactGrid(number_of_columns, number_of_rows)
+        self.renderer = GridRenderer(self.window, self.grid, BLOCK_SIZE, OFFSET_X, OFFSET_Y)
 
-    def mark_block_as_visited_revisited_or_part_of_path(self, block):
-        circle_x = block.x_index * BLOCK_SIZE + OFFSET_X + BLOCK_SIZE / 2
-        circle_y = block.y_index * BLOCK_SIZE + OFFSET_Y + BLOCK_SIZE / 2
+    def draw_grid(self):
+        """Draws blocks changed since the last frame and updates only their part of the display."""
+        self.renderer.set_visibility(self.show_visited_revisited, self.show_path)
+        changed_rects = self.renderer.render()
+        if changed_rects is None:
+            pygame.display.update()
+        elif changed_rects:
+            pygame.display.update(changed_rects)
 
-        if block.part_of_path and self.show_path:
-            pygame.draw.circle(self.window, "white", (circle_x, circle_y), BLOCK_SIZE / 4)
-        elif block.revisited and self.show_visited_revisited:
-            pygame.draw.circle(self.window, "green", (circle_x, circle_y), BLOCK_SIZE / 4)
-        elif block.visited and self.show_visited_revisited:
-            pygame.draw.circle(self.window, "orange", (circle_x, circle_y), BLOCK_SIZE / 4)
+    def record(self, algorithm):
+        if RECORD_RUNS:
+            self.recorder = Recorder(self.grid)
+            self.recorder.attach(algorithm)
 
-    def draw_grid(self, grid):
-        for block in grid:
-            top_left_corner = (block.x_index * BLOCK_SIZE + OFFSET_X,
-                               block.y_index * BLOCK_SIZE + OFFSET_Y)
-            top_right_corner = (block.x_index * BLOCK_SIZE + OFFSET_X + BLOCK_SIZE,
-                                block.y_index * BLOCK_SIZE + OFFSET_Y)
-            bottom_left_corner = (block.x_index * BLOCK_SIZE + OFFSET_X,
-                                  block.y_index * BLOCK_SIZE + OFFSET_Y + BLOCK_SIZE)
-            bottom_right_corner = (block.x_index * BLOCK_SIZE + OFFSET_X + BLOCK_SIZE,
-                                   block.y_index * BLOCK_SIZE + OFFSET_Y + BLOCK_SIZE)
-            if block.wall.n:
-                pygame.draw.line(self.window, "orange", top_left_corner, top_right_corner, 1)
-            if block.wall.e:
-                pygame.draw.line(self.window, "orange", top_right_corner, bottom_right_corner, 1)
-            if block.wall.s:
-                pygame.draw.line(self.window, "orange", bottom_right_corner, bottom_left_corner, 1)
-            if block.wall.w:
-                pygame.draw.line(self.window, "orange", bottom_left_corner, top_left_corner, 1)
+    def start_replay(self):
+        if self.recorder is not None and self.player is None:
+            self.player = Player(self.recorder.recording, self.grid)
+            self.is_replay_paused = False
+            self.show_visited_revisited = True
 
-            if self.show_visited_revisited or self.show_path:
-                self.mark_block_as_visited_revisited_or_part_of_path(block)
+    def stop_replay(self):
+        """Leaves the grid as it was at the end of the recorded run."""
+        if self.player is not None:
+            self.player.seek(len(self.player.recording))
+            self.player = None
 
-    def clear_screen(self):
-        self.window.fill("black")
+    def seek_replay(self, step):
+        if self.player is not None:
+            self.player.seek(step)
+            print(f"Replay at step {self.player.position} of {len(self.player.recording)}.")
 
     def check_events(self):
         for event in pygame.event.get():
@@ -84,13 +100,45 @@ class Game:
                 elif event.key == pygame.K_ESCAPE:  # Hide the shortest path and building/solving visualization
                     self.show_path = False
                     self.show_visited_revisited = False
+                elif event.key == pygame.K_UP:  # Make twice as many algorithm steps every frame
+                    self.steps_per_frame *= 2
+                elif event.key == pygame.K_DOWN:  # Make half as many algorithm steps every frame
+                    self.steps_per_frame = max(1, self.steps_per_frame // 2)
+                elif event.key == pygame.K_r:  # Replay the last generating or solving run
+                    if self.is_maze_generated and self.algorithm is None:
+                        self.start_replay()
+                elif event.key == pygame.K_p:  # Pause/resume the replay
+                    self.is_replay_paused = not self.is_replay_paused
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):  # Seek a tenth of the replay back/forward
+                    if self.player is not None:
+                        tenth = max(1, len(self.player.recording) // 10)
+                        self.seek_replay(self.player.position + (tenth if event.key == pygame.K_RIGHT else -tenth))
+                elif event.key == pygame.K_HOME:  # Jump to the start of the replay
+                    self.seek_replay(0)
+                elif event.key == pygame.K_END:  # Jump to the end of the replay
+                    self.seek_replay(len(self.player.recording) if self.player is not None else 0)
                 elif event.key == pygame.K_g:  # Generate a new maze
+                    self.player = None
+                    self.is_grid_created = False
+                    self.is_maze_generated = False
+                elif event.key == pygame.K_n:  # Generate a new maze using the next generating algorithm
+                    names = list(GENERATING_ALGORITHMS)
+                    self.generating_algorithm = names[(names.index(self.generating_algorithm) + 1) % len(names)]
+                    print(f"A maze is generated by {self.generating_algorithm}.")
+                    self.player = None
                     self.is_grid_created = False
                     self.is_maze_generated = False
-                elif event.key == pygame.K_1 or event.key == pygame.K_2 or event.key == pygame.K_3:
-                    # Use DFS/BSF/A* algorithm to solve a maze
+                elif event.key == pygame.K_b:  # Remove dead ends of the generated maze to create loops
+                    if self.is_maze_generated and self.algorithm is None:
+                        self.stop_replay()
+                        self.recorder = None  # The recorded run no longer ends with the maze on the grid
+                        print(f"{braid(self.grid)} walls were removed.")
+                elif pygame.K_1 <= event.key <= pygame.K_6:
+                    # Use DFS/BSF/A*/bidirectional BFS/bidirectional A*/JPS algorithm to solve a maze
                     if self.is_maze_generated and self.algorithm is None:
-                        event_key_map = {49: "DFS", 50: "BFS", 51: "A*"}
+                        event_key_map = {49: "DFS", 50: "BFS", 51: "A*", 52: "Bidirectional BFS",
+                                         53: "Bidirectional A*", 54: "JPS"}
+                        self.stop_replay()
                         self.show_visited_revisited = True
                         self.chosen_solving_algorithm = event_key_map[event.key]
             elif event.type == pygame.QUIT:
@@ -98,39 +146,53 @@ class Game:
             elif event.type == pygame.VIDEORESIZE:
                 self.window_size = event.size
                 self.window = pygame.display.set_mode(self.window_size, pygame.RESIZABLE)
+                if self.renderer is not None:
+                    self.renderer.set_window(self.window)
 
     def assign_chosen_solving_algorithm(self):
         if self.chosen_solving_algorithm == "DFS":
             self.algorithm = DepthFirstSearch(self.grid, self.grid[0], self.grid[-1])
         elif self.chosen_solving_algorithm == "BFS":
             self.algorithm = BreadthFirstSearch(self.grid, self.grid[0], self.grid[-1])
-        else:  # self.chosen_solving_algorithm == "A*"
+        elif self.chosen_solving_algorithm == "A*":
             self.algorithm = AStar(self.grid, self.grid[0], self.grid[-1])
+        elif self.chosen_solving_algorithm == "Bidirectional BFS":
+            self.algorithm = BidirectionalBreadthFirstSearch(self.grid, self.grid[0], self.grid[-1])
+        elif self.chosen_solving_algorithm == "Bidirectional A*":
+            self.algorithm = BidirectionalAStar(self.grid, self.grid[0], self.grid[-1])
+        else:  # self.chosen_solving_algorithm == "JPS"
+            self.algorithm = JumpPointSearch(self.grid, self.grid[0], self.grid[-1])
 
     def game_loop(self):
-        self.clock.tick(60)
-        build_dfs = None
+        build_maze = None
 
         while self.run:
             # pygame.time.delay(100)
-            self.clear_screen()
             if not self.is_grid_created:    # Runs when a grid needs to be created
                 self.create_grid(GRID_COLUMNS, GRID_ROWS)
-                build_dfs = RandomizedDepthFirstSearch(self.grid)
+                build_maze = instrument(GENERATING_ALGORITHMS[self.generating_algorithm](self.grid), self.metrics)
+                self.record(build_maze)
                 self.is_grid_created = True
-            self.draw_grid(self.grid)
-            if not self.is_maze_generated:  # Runs when a maze needs to be generated
-                self.is_maze_generated = build_dfs.iterate()
+            if self.player is not None:  # Runs when the last run is replayed
+                if not self.is_replay_paused and self.scheduler.advance(self.player.step_forward, self.steps_per_frame):
+                    print(f"The replay of {len(self.player.recording)} steps has finished.")
+                    self.player = None
+            elif not self.is_maze_generated:  # Runs when a maze needs to be generated
+                self.is_maze_generated = self.scheduler.advance(build_maze.step, self.steps_per_frame)
             elif self.chosen_solving_algorithm is not None:  # Runs when a maze needs to be solved
                 if self.algorithm is None:
                     self.assign_chosen_solving_algorithm()
-                is_maze_solved = self.algorithm.iterate()
-                self.iteration_counter += 1
+                    instrument(self.algorithm, self.metrics)
+                    self.record(self.algorithm)
+                is_maze_solved = self.scheduler.advance(self.algorithm.step, self.steps_per_frame)
                 if is_maze_solved:
-                    print(f"The maze was solved by {self.chosen_solving_algorithm} in {self.iteration_counter} steps.")
+                    print(f"The maze was solved by {self.chosen_solving_algorithm} "
+                          f"in {self.algorithm.steps_taken} steps.")
                     self.chosen_solving_algorithm = None
                     self.algorithm = None
-                    self.iteration_counter = 0
             self.check_events()
-            pygame.display.update()
+            self.draw_grid()
+            self.clock.tick(FRAME_RATE)
+        if self.metrics is not None:
+            self.metrics.write(METRICS_FILE)
         pygame.quit()
@@ -1,4 +1,6 @@
 class Wall:
+    __slots__ = ("n", "e", "s", "w")
+
     def __init__(self):
         self.n = True
         self.e = True
@@ -7,6 +9,8 @@ class Wall:
 
 
 class Block:
+    __slots__ = ("x_index", "y_index", "wall", "visited", "revisited", "part_of_path")
+
     def __init__(self, x_index, y_index):
         self.x_index = x_index
         self.y_index = y_index
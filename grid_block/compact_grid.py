@@ -0,0 +1,215 @@
+WALL_N, WALL_E, WALL_S, WALL_W = 1, 2, 4, 8
+ALL_WALLS = WALL_N | WALL_E | WALL_S | WALL_W
+
+VISITED, REVISITED, PART_OF_PATH = 1, 2, 4
+
+# Used to clear visited and revisited bits of every block in one pass done in C.
+_CLEAR_VISITED_REVISITED = bytes(value & ~(VISITED | REVISITED) for value in range(256))
+
+
+class CompactGrid:
+    """A grid of blocks stored in flat buffers instead of a list of Block objects.
+    Walls of a block are kept as a 4-bit mask (N, E, S, W) in one bytearray and visited, revisited
+    and part of path flags are kept as bit planes of another bytearray. Both are indexed by grid index
+    (no_of_columns * y_index + x_index).
+    Indexing and iterating the grid returns BlockView objects, so the grid can be used everywhere
+    a list of Block objects is expected.
+    After track_changes() grid indices of blocks changed through the grid methods are collected
+    in changed_indices, so a renderer can redraw only them."""
+    changed_indices = None  # Set of changed grid indices, None if changes aren't tracked
+    is_fully_changed = False  # Set instead of collecting indices when every block may have changed
+
+    def __init__(self, no_of_columns, no_of_rows, walls=None):
+        self.no_of_columns = no_of_columns
+        self.no_of_rows = no_of_rows
+        size = no_of_columns * no_of_rows
+        self.walls = bytearray([ALL_WALLS]) * size if walls is None else walls
+        self.state = bytearray(size)
+
+    def __len__(self):
+        return len(self.walls)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.walls)
+        if not 0 <= index < len(self.walls):
+            raise IndexError("grid index out of range")
+        return BlockView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.walls)):
+            yield BlockView(self, index)
+
+    def __repr__(self):
+        return f"CompactGrid({self.no_of_columns}, {self.no_of_rows})"
+
+    def index_of(self, x_index, y_index):
+        return self.no_of_columns * y_index + x_index
+
+    def track_changes(self):
+        self.changed_indices = set()
+        self.is_fully_changed = True
+
+    def mark_changed(self, index):
+        if self.changed_indices is not None:
+            self.changed_indices.add(index)
+
+    def mark_fully_changed(self):
+        if self.changed_indices is not None:
+            self.is_fully_changed = True
+
+    def take_changes(self):
+        """Returns grid indices changed since the last call (None if every block may have changed)
+        and starts collecting them again."""
+        changed_indices = None if self.is_fully_changed else self.changed_indices
+        self.changed_indices = set()
+        self.is_fully_changed = False
+        return changed_indices
+
+    def has_flag(self, index, flag):
+        return bool(self.state[index] & flag)
+
+    def set_flag(self, index, flag, value=True):
+        if value:
+            self.state[index] |= flag
+        else:
+            self.state[index] &= ~flag
+        if self.changed_indices is not None:
+            self.changed_indices.add(index)
+
+    def remove_wall_between(self, index, other_index):
+        """Removes proper walls of two adjacent blocks given by their grid indices."""
+        if other_index == index + self.no_of_columns:
+            self.walls[index] &= ~WALL_S
+            self.walls[other_index] &= ~WALL_N
+        elif other_index == index - self.no_of_columns:
+            self.walls[index] &= ~WALL_N
+            self.walls[other_index] &= ~WALL_S
+        elif other_index > index:
+            self.walls[index] &= ~WALL_E
+            self.walls[other_index] &= ~WALL_W
+        else:
+            self.walls[index] &= ~WALL_W
+            self.walls[other_index] &= ~WALL_E
+        if self.changed_indices is not None:
+            self.changed_indices.add(index)
+            self.changed_indices.add(other_index)
+
+    def reset_visited_revisited(self):
+        """Clears visited and revisited flags of every block without creating any BlockView."""
+        self.state[:] = self.state.translate(_CLEAR_VISITED_REVISITED)
+        self.mark_fully_changed()
+
+
+class WallView:
+    """Exposes the wall mask of a single block of a CompactGrid with the same attributes as Wall."""
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    def _get(self, side):
+        return bool(self.grid.walls[self.index] & side)
+
+    def _set(self, side, value):
+        if value:
+            self.grid.walls[self.index] |= side
+        else:
+            self.grid.walls[self.index] &= ~side
+        self.grid.mark_changed(self.index)
+
+    n = property(lambda self: self._get(WALL_N), lambda self, value: self._set(WALL_N, value))
+    e = property(lambda self: self._get(WALL_E), lambda self, value: self._set(WALL_E, value))
+    s = property(lambda self: self._get(WALL_S), lambda self, value: self._set(WALL_S, value))
+    w = property(lambda self: self._get(WALL_W), lambda self, value: self._set(WALL_W, value))
+
+
+class BlockView:
+    """A thin view of a single block of a CompactGrid with the same interface as Block.
+    It holds only the grid and the grid index, every attribute is read from and written to the grid buffers."""
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    def __eq__(self, other):
+        return self.x_index == other.x_index and self.y_index == other.y_index
+
+    # Used by heapq.heappush in PriorityQueue
+    def __lt__(self, other):
+        return self.x_index + self.y_index < other.x_index + other.y_index
+
+    def __repr__(self):
+        return f"Block({self.x_index}, {self.y_index})"
+
+    @property
+    def x_index(self):
+        return self.index % self.grid.no_of_columns
+
+    @property
+    def y_index(self):
+        return self.index // self.grid.no_of_columns
+
+    @property
+    def indices(self):
+        return self.x_index, self.y_index
+
+    @property
+    def wall(self):
+        return WallView(self.grid, self.index)
+
+    visited = property(lambda self: self.grid.has_flag(self.index, VISITED),
+                       lambda self, value: self.grid.set_flag(self.index, VISITED, value))
+    revisited = property(lambda self: self.grid.has_flag(self.index, REVISITED),
+                         lambda self, value: self.grid.set_flag(self.index, REVISITED, value))
+    part_of_path = property(lambda self: self.grid.has_flag(self.index, PART_OF_PATH),
+                            lambda self, value: self.grid.set_flag(self.index, PART_OF_PATH, value))
+
+    def look_for_neighbour(self, grid):
+        """Used when building a maze.
+        Creates a list of neighbours that haven't been visited yet of the current block."""
+        grid = self.grid
+        no_of_columns = grid.no_of_columns
+        index = self.index
+        x_index, y_index = index % no_of_columns, index // no_of_columns
+        state = grid.state
+        neighbours = []
+        if y_index != 0 and not state[index - no_of_columns] & VISITED:
+            neighbours.append(BlockView(grid, index - no_of_columns))
+        if x_index != no_of_columns - 1 and not state[index + 1] & VISITED:
+            neighbours.append(BlockView(grid, index + 1))
+        if y_index != grid.no_of_rows - 1 and not state[index + no_of_columns] & VISITED:
+            neighbours.append(BlockView(grid, index + no_of_columns))
+        if x_index != 0 and not state[index - 1] & VISITED:
+            neighbours.append(BlockView(grid, index - 1))
+        return neighbours
+
+    def remove_wall_between_two_blocks(self, other_block):
+        """Used when building a maze.
+        Removes proper walls of two adjacent blocks"""
+        self.grid.remove_wall_between(self.index, other_block.index)
+
+    def determine_valid_neighbours(self, grid):
+        """Used when solving a maze.
+        Creates a list of valid neighbours (no wall between) of the current block."""
+        grid = self.grid
+        no_of_columns = grid.no_of_columns
+        index = self.index
+        walls = grid.walls[index]
+        neighbours = []
+        if not walls & WALL_N:
+            neighbours.append(BlockView(grid, index - no_of_columns))
+        if not walls & WALL_E:
+            neighbours.append(BlockView(grid, index + 1))
+        if not walls & WALL_S:
+            neighbours.append(BlockView(grid, index + no_of_columns))
+        if not walls & WALL_W:
+            neighbours.append(BlockView(grid, index - 1))
+        return neighbours
+
+    def reset_visited_revisited(self):
+        """Allows for the visited and revisited attribute to be used when solving a maze to visualize progress
+        and the shortest path found."""
+        self.grid.set_flag(self.index, VISITED | REVISITED, False)
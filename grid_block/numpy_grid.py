@@ -0,0 +1,118 @@
+"""Whole-maze analysis with NumPy. NumPy is optional and only needed by this module."""
+from grid_block.block import Block
+from grid_block.compact_grid import CompactGrid, WALL_N, WALL_E, WALL_S, WALL_W
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+class NumpyGrid:
+    """A grid stored as a 2D uint8 array of 4-bit wall masks (see grid_block.compact_grid) with shape
+    (no_of_rows, no_of_columns), offering vectorized whole-maze metrics: neighbour masks, dead ends,
+    corridor lengths, branching factor and a distance field.
+    Can be created from and converted to a CompactGrid or a list of Block objects, so the results
+    of maze_solving algorithms can be cross-checked."""
+    def __init__(self, walls):
+        if np is None:
+            raise ImportError("NumpyGrid requires NumPy, install it with: pip install numpy")
+        self.walls = np.asarray(walls, dtype=np.uint8)
+        if self.walls.ndim != 2:
+            raise ValueError("walls must be a 2D array of shape (no_of_rows, no_of_columns)")
+        self.no_of_rows, self.no_of_columns = self.walls.shape
+
+    def __repr__(self):
+        return f"NumpyGrid({self.no_of_columns}, {self.no_of_rows})"
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Creates a NumpyGrid from a CompactGrid (including a MappedGrid) or a list of Block objects."""
+        no_of_columns = grid[-1].x_index + 1
+        no_of_rows = grid[-1].y_index + 1
+        if isinstance(grid, CompactGrid):
+            walls = bytes(grid.walls[:])
+        else:
+            walls = bytes(WALL_N * block.wall.n | WALL_E * block.wall.e | WALL_S * block.wall.s
+                          | WALL_W * block.wall.w for block in grid)
+        return cls(np.frombuffer(walls, dtype=np.uint8).reshape(no_of_rows, no_of_columns).copy())
+
+    def to_compact_grid(self):
+        return CompactGrid(self.no_of_columns, self.no_of_rows, walls=bytearray(self.walls.tobytes()))
+
+    def to_blocks(self):
+        """Creates a list of Block objects in grid index order."""
+        blocks = []
+        for (y_index, x_index), wall_mask in np.ndenumerate(self.walls):
+            block = Block(x_index, y_index)
+            block.wall.n, block.wall.e = bool(wall_mask & WALL_N), bool(wall_mask & WALL_E)
+            block.wall.s, block.wall.w = bool(wall_mask & WALL_S), bool(wall_mask & WALL_W)
+            blocks.append(block)
+        return blocks
+
+    def neighbour_masks(self):
+        """Returns boolean arrays telling if a block is open to its N, E, S and W neighbour.
+        Walls on the edges of the grid are treated as present even if they have been removed."""
+        is_open = [(self.walls & wall) == 0 for wall in (WALL_N, WALL_E, WALL_S, WALL_W)]
+        is_open[0][0, :] = False
+        is_open[1][:, -1] = False
+        is_open[2][-1, :] = False
+        is_open[3][:, 0] = False
+        return tuple(is_open)
+
+    def degrees(self):
+        """Returns the number of open sides of every block."""
+        return sum(mask.astype(np.uint8) for mask in self.neighbour_masks())
+
+    def dead_ends(self):
+        """Returns a boolean array marking blocks with exactly one open side."""
+        return self.degrees() == 1
+
+    def count_dead_ends(self):
+        return int(np.count_nonzero(self.dead_ends()))
+
+    def junctions(self):
+        """Returns a boolean array marking blocks with three or four open sides."""
+        return self.degrees() >= 3
+
+    def branching_factor(self):
+        """Average number of ways to continue from a block without going back, over blocks that aren't dead ends."""
+        degrees = self.degrees()
+        passable = degrees >= 2
+        if not passable.any():
+            return 0.0
+        return float((degrees[passable] - 1).mean())
+
+    def corridor_lengths(self):
+        """Returns lengths (in blocks) of all maximal straight corridors, horizontal and vertical,
+        i.e. runs of at least two blocks connected in a straight line."""
+        _, is_open_east, is_open_south, _ = self.neighbour_masks()
+        lengths = []
+        for runs in (is_open_east, is_open_south.T):
+            # A False column after every row makes runs end at the end of a row.
+            flat = np.zeros((runs.shape[0], runs.shape[1] + 1), dtype=np.int8)
+            flat[:, :-1] = runs
+            edges = np.diff(np.concatenate(([0], flat.ravel(), [0])))
+            starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            lengths.append(ends - starts + 1)
+        return np.concatenate(lengths)
+
+    def distance_field(self, start=(0, 0)):
+        """Returns the number of steps from the start block (x_index, y_index) to every block
+        (-1 for unreachable blocks) computed by Breadth First Search expanding the whole frontier at once
+        with array operations on flat grid indices."""
+        no_of_columns = self.no_of_columns
+        is_open = [mask.ravel() for mask in self.neighbour_masks()]
+        offsets = (-no_of_columns, 1, no_of_columns, -1)
+        distances = np.full(self.walls.size, -1, dtype=np.int64)
+        frontier = np.array([start[1] * no_of_columns + start[0]], dtype=np.int64)
+        distances[frontier] = 0
+        level = 0
+        while frontier.size:
+            level += 1
+            neighbours = np.concatenate([frontier[is_open[direction][frontier]] + offsets[direction]
+                                         for direction in range(4)])
+            neighbours = np.unique(neighbours[distances[neighbours] < 0])
+            distances[neighbours] = level
+            frontier = neighbours
+        return distances.reshape(self.walls.shape)
@@ -0,0 +1,114 @@
+import pygame
+
+from grid_block.compact_grid import WALL_N, WALL_E, WALL_S, WALL_W, VISITED, REVISITED, PART_OF_PATH
+
+BACKGROUND_COLOUR = "black"
+WALL_COLOUR = "orange"
+
+
+class GridRenderer:
+    """Draws a CompactGrid on a window redrawing only blocks changed since the last frame.
+    Walls are cached on an off-screen surface (the wall layer). A changed block is redrawn by updating its part
+    of the wall layer if its walls changed, copying that part to the window and drawing its dot on top,
+    so the cost of a frame depends on the number of changed blocks and not on the size of the grid."""
+    def __init__(self, window, grid, block_size, offset_x, offset_y):
+        self.window = window
+        self.grid = grid
+        self.block_size = block_size
+        self.offset_x, self.offset_y = offset_x, offset_y
+        self.no_of_columns, self.no_of_rows = grid.no_of_columns, grid.no_of_rows
+        self.wall_layer = pygame.Surface((self.no_of_columns * block_size + 1, self.no_of_rows * block_size + 1))
+        self.drawn_walls = None  # Wall masks as drawn on the wall layer, used to find blocks with changed walls
+        self.show_visited_revisited = True
+        self.show_path = False
+        self.needs_full_redraw = True
+        grid.track_changes()
+
+    def set_window(self, window):
+        """Used when the window has been recreated, e.g. resized."""
+        self.window = window
+        self.needs_full_redraw = True
+
+    def set_visibility(self, show_visited_revisited, show_path):
+        if (show_visited_revisited, show_path) != (self.show_visited_revisited, self.show_path):
+            self.show_visited_revisited, self.show_path = show_visited_revisited, show_path
+            self.needs_full_redraw = True
+
+    def block_rect(self, index):
+        """Rectangle of a block including its walls in wall layer coordinates."""
+        return pygame.Rect(index % self.no_of_columns * self.block_size, index // self.no_of_columns * self.block_size,
+                           self.block_size + 1, self.block_size + 1)
+
+    def draw_walls(self, index):
+        left, top = index % self.no_of_columns * self.block_size, index // self.no_of_columns * self.block_size
+        right, bottom = left + self.block_size, top + self.block_size
+        walls = self.grid.walls[index]
+        if walls & WALL_N:
+            pygame.draw.line(self.wall_layer, WALL_COLOUR, (left, top), (right, top), 1)
+        if walls & WALL_E:
+            pygame.draw.line(self.wall_layer, WALL_COLOUR, (right, top), (right, bottom), 1)
+        if walls & WALL_S:
+            pygame.draw.line(self.wall_layer, WALL_COLOUR, (right, bottom), (left, bottom), 1)
+        if walls & WALL_W:
+            pygame.draw.line(self.wall_layer, WALL_COLOUR, (left, bottom), (left, top), 1)
+
+    def draw_dot(self, index):
+        """Marks a block as visited, revisited or part of path on the window."""
+        state = self.grid.state[index]
+        if state & PART_OF_PATH and self.show_path:
+            colour = "white"
+        elif state & REVISITED and self.show_visited_revisited:
+            colour = "green"
+        elif state & VISITED and self.show_visited_revisited:
+            colour = "orange"
+        else:
+            return
+        centre = (index % self.no_of_columns * self.block_size + self.offset_x + self.block_size / 2,
+                  index // self.no_of_columns * self.block_size + self.offset_y + self.block_size / 2)
+        pygame.draw.circle(self.window, colour, centre, self.block_size / 4)
+
+    def redraw_walls_of_block(self, index):
+        """Redraws the part of the wall layer covered by a block. Walls of adjacent blocks are drawn
+        clipped to that part as they share its edges."""
+        rect = self.block_rect(index)
+        self.wall_layer.set_clip(rect)
+        self.wall_layer.fill(BACKGROUND_COLOUR, rect)
+        x_index, y_index = index % self.no_of_columns, index // self.no_of_columns
+        for y in range(max(y_index - 1, 0), min(y_index + 2, self.no_of_rows)):
+            for x in range(max(x_index - 1, 0), min(x_index + 2, self.no_of_columns)):
+                self.draw_walls(y * self.no_of_columns + x)
+        self.wall_layer.set_clip(None)
+
+    def full_redraw(self):
+        self.wall_layer.fill(BACKGROUND_COLOUR)
+        for index in range(len(self.grid)):
+            self.draw_walls(index)
+        self.drawn_walls = self.grid.walls[:]
+        self.window.fill(BACKGROUND_COLOUR)
+        self.window.blit(self.wall_layer, (self.offset_x, self.offset_y))
+        if self.show_visited_revisited or self.show_path:
+            for index in range(len(self.grid)):
+                self.draw_dot(index)
+
+    def render(self):
+        """Draws changes of the grid made since the last call.
+        Returns a list of changed window rectangles or None if the whole window has been redrawn."""
+        changed_indices = self.grid.take_changes()
+        if self.needs_full_redraw or changed_indices is None:
+            self.needs_full_redraw = False
+            self.full_redraw()
+            return None
+
+        walls, drawn_walls = self.grid.walls, self.drawn_walls
+        rects = []
+        for index in changed_indices:
+            if walls[index] != drawn_walls[index]:
+                drawn_walls[index] = walls[index]
+                self.redraw_walls_of_block(index)
+        for index in changed_indices:
+            rect = self.block_rect(index)
+            window_rect = rect.move(self.offset_x, self.offset_y)
+            self.window.blit(self.wall_layer, window_rect, rect)
+            self.draw_dot(index)
+            rects.append(window_rect)
+        return rects
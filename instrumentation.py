@@ -0,0 +1,230 @@
+"""Opt-in instrumentation of generating and solving algorithms and of the data types they use.
+Nothing is measured unless asked for: instrument() replaces methods of a single algorithm object with measuring
+wrappers and instrument_methods() patches methods of classes only inside a with block, so code that isn't
+instrumented runs exactly as before, without any overhead.
+
+Example:
+    metrics = Metrics()
+    solver = instrument(BreadthFirstSearch(grid, grid[0], grid[-1]), metrics)
+    while not solver.step(100):
+        pass
+    metrics.write("metrics.json")  # or .csv
+"""
+import csv
+import io
+import json
+import time
+from contextlib import contextmanager
+
+from data_types.disjoint_set import DisjointSet
+from data_types.my_queue import Queue
+from data_types.priority_queue import PriorityQueue, AStarOpenSet
+from data_types.stack import Stack
+
+# Methods measured when a data type is used by an instrumented algorithm.
+DATA_TYPE_METHODS = {
+    Stack: ("push", "pop"),
+    Queue: ("enqueue", "dequeue"),
+    PriorityQueue: ("put", "get"),
+    AStarOpenSet: ("put", "get"),
+    DisjointSet: ("find", "union"),
+}
+# Attributes holding the frontier (blocks waiting to be expanded or carved from) of algorithms.
+FRONTIER_ATTRIBUTES = ("stack", "queue", "queues", "open_set", "open_sets", "open_nodes", "frontier")
+
+
+class Metrics:
+    """Collects counters, timers (number of calls and total time) and gauges keeping the maximum value seen.
+    Callbacks added with add_callback(callback) are called as callback(kind, name, value) for every recorded value,
+    kind being "counter", "timer" or "gauge", e.g. to stream values to a monitoring system."""
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}  # name: [number of calls, total seconds]
+        self.gauges = {}
+        self.callbacks = []
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+        for callback in self.callbacks:
+            callback("counter", name, value)
+
+    def add_time(self, name, seconds):
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+        for callback in self.callbacks:
+            callback("timer", name, seconds)
+
+    def observe_max(self, name, value):
+        if value > self.gauges.get(name, value - 1):
+            self.gauges[name] = value
+        for callback in self.callbacks:
+            callback("gauge", name, value)
+
+    @contextmanager
+    def timer(self, name):
+        """Measures the time spent in a with block."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start_time)
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.gauges.clear()
+
+    def as_dict(self):
+        """Returns all metrics. Timers report calls per second too, e.g. blocks expanded per second
+        for the iterate() timer of a solving algorithm."""
+        timers = {}
+        for name, (calls, seconds) in self.timers.items():
+            timers[name] = {"calls": calls, "total_seconds": seconds, "mean_seconds": seconds / calls,
+                            "calls_per_second": calls / seconds if seconds else None}
+        return {"counters": dict(self.counters), "timers": timers, "gauges": dict(self.gauges)}
+
+    def rows(self):
+        """Yields metrics as (kind, name, field, value) rows."""
+        metrics = self.as_dict()
+        for name, value in metrics["counters"].items():
+            yield "counter", name, "value", value
+        for name, fields in metrics["timers"].items():
+            for field, value in fields.items():
+                yield "timer", name, field, value
+        for name, value in metrics["gauges"].items():
+            yield "gauge", name, "max", value
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_csv(self):
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(("kind", "name", "field", "value"))
+        writer.writerows(self.rows())
+        return output.getvalue()
+
+    def write(self, path):
+        """Writes metrics to a file, as CSV if its name ends with .csv and as JSON otherwise."""
+        with open(path, "w", newline="") as file:
+            file.write(self.to_csv() if path.endswith(".csv") else self.to_json())
+
+
+def timed(function, metrics, name):
+    """Returns a wrapper of a function adding the time of every call to a timer."""
+    perf_counter = time.perf_counter
+
+    def timed_function(*args, **kwargs):
+        start_time = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics.add_time(name, perf_counter() - start_time)
+
+    timed_function.__wrapped__ = function
+    return timed_function
+
+
+def data_size(data):
+    if isinstance(data, (Stack, Queue)):
+        return data.size()
+    if isinstance(data, PriorityQueue):
+        return len(data.elements)
+    return len(data)
+
+
+def frontier_size(algorithm):
+    """Returns the number of elements waiting in the frontier of an algorithm or None if it has none."""
+    size = None
+    for attribute in FRONTIER_ATTRIBUTES:
+        frontier = getattr(algorithm, attribute, None)
+        if frontier is not None:
+            frontiers = frontier if isinstance(frontier, tuple) else (frontier,)
+            size = (size or 0) + sum(data_size(part) for part in frontiers)
+    return size
+
+
+def instrument_data_type(data, metrics, prefix):
+    """Measures calls of methods of a data type object (see DATA_TYPE_METHODS) under prefix.method names."""
+    for method_name in DATA_TYPE_METHODS.get(type(data), ()):
+        setattr(data, method_name, timed(getattr(data, method_name), metrics, f"{prefix}.{method_name}"))
+    return data
+
+
+def instrument(algorithm, metrics, prefix=None):
+    """Measures a generating or solving algorithm object (anything with iterate(), step() and run())
+    and the data types it holds. Returns the same object. With metrics None nothing is changed,
+    so instrumentation can be switched off without changing the calling code.
+    Recorded under prefix (the class name by default):
+    - prefix.iterate timer: time and number of iterations, i.e. blocks expanded or carved,
+    - prefix.steps counter: steps taken by step() and run(), including tight run() loops bypassing iterate(),
+    - prefix.run timer: time of run(),
+    - prefix.frontier gauge: the largest frontier (stack, queue or open set) seen after an iteration,
+    - prefix.<attribute>.<method> timers: operations on data types, e.g. AStar.open_set.put.
+    Tight run() loops work on data types directly, so only their totals are recorded."""
+    if metrics is None:
+        return algorithm
+    prefix = prefix if prefix is not None else type(algorithm).__name__
+    iterate, step, run = algorithm.iterate, algorithm.step, algorithm.run
+    perf_counter = time.perf_counter
+    has_frontier = frontier_size(algorithm) is not None
+    iterate_name, frontier_name, steps_name = f"{prefix}.iterate", f"{prefix}.frontier", f"{prefix}.steps"
+
+    def instrumented_iterate():
+        start_time = perf_counter()
+        is_finished = iterate()
+        metrics.add_time(iterate_name, perf_counter() - start_time)
+        if has_frontier:
+            metrics.observe_max(frontier_name, frontier_size(algorithm))
+        return is_finished
+
+    def instrumented_step(n=1):
+        steps_taken = algorithm.steps_taken
+        is_finished = step(n)
+        metrics.count(steps_name, algorithm.steps_taken - steps_taken)
+        return is_finished
+
+    def instrumented_run():
+        steps_taken = algorithm.steps_taken
+        with metrics.timer(f"{prefix}.run"):
+            result = run()
+        metrics.count(steps_name, algorithm.steps_taken - steps_taken)
+        return result
+
+    algorithm.iterate, algorithm.step, algorithm.run = instrumented_iterate, instrumented_step, instrumented_run
+    for attribute, data in vars(algorithm).items():
+        for part in data if isinstance(data, tuple) else (data,):
+            if type(part) in DATA_TYPE_METHODS:
+                instrument_data_type(part, metrics, f"{prefix}.{attribute}")
+    return algorithm
+
+
+@contextmanager
+def instrument_methods(metrics, *targets):
+    """Measures methods of classes given as (class, method name) pairs inside a with block, e.g.
+    with instrument_methods(metrics, (Block, "determine_valid_neighbours")):
+    Timers are named ClassName.method_name. Original methods are restored when the block ends."""
+    originals = []  # (class, method name, method defined in the class itself or None if inherited)
+    try:
+        for cls, method_name in targets:
+            original = cls.__dict__.get(method_name)
+            originals.append((cls, method_name, original))
+            name = f"{cls.__name__}.{method_name}"
+            if isinstance(original, staticmethod):
+                setattr(cls, method_name, staticmethod(timed(original.__func__, metrics, name)))
+            else:
+                setattr(cls, method_name, timed(getattr(cls, method_name), metrics, name))
+        yield metrics
+    finally:
+        for cls, method_name, original in reversed(originals):
+            if original is None:
+                delattr(cls, method_name)
+            else:
+                setattr(cls, method_name, original)
@@ -1,8 +1,15 @@
-from game import Game
+import sys
 
 
 if __name__ == "__main__":
-    game = Game()
+    if len(sys.argv) > 1:  # Any arguments run the headless command line interface
+        from cli import main
 
-    while game.run:
-        game.game_loop()
+        main(sys.argv[1:])
+    else:
+        from game import Game  # pygame is imported only when the graphical frontend is used
+
+        game = Game()
+
+        while game.run:
+            game.game_loop()
@@ -0,0 +1,65 @@
+"""Post-processing of generated mazes adding loops, so there is more than one path between blocks.
+Works on a list of Block objects and on a CompactGrid."""
+import random
+
+
+def walled_neighbours(grid, block):
+    """Returns adjacent blocks separated from a block by a wall."""
+    no_of_columns = grid[-1].x_index + 1
+    no_of_rows = grid[-1].y_index + 1
+    grid_index = no_of_columns * block.y_index + block.x_index
+    neighbours = []
+    if block.y_index != 0 and block.wall.n:
+        neighbours.append(grid[grid_index - no_of_columns])
+    if block.x_index != no_of_columns - 1 and block.wall.e:
+        neighbours.append(grid[grid_index + 1])
+    if block.y_index != no_of_rows - 1 and block.wall.s:
+        neighbours.append(grid[grid_index + no_of_columns])
+    if block.x_index != 0 and block.wall.w:
+        neighbours.append(grid[grid_index - 1])
+    return neighbours
+
+
+def is_dead_end(grid, block):
+    no_of_columns = grid[-1].x_index + 1
+    no_of_rows = grid[-1].y_index + 1
+    no_of_walls = (block.wall.n or block.y_index == 0) + (block.wall.e or block.x_index == no_of_columns - 1) \
+        + (block.wall.s or block.y_index == no_of_rows - 1) + (block.wall.w or block.x_index == 0)
+    return no_of_walls == 3
+
+
+def braid(grid, ratio=1.0, rng=None):
+    """Removes dead ends: each dead end, visited in random order, is with probability ratio connected
+    to one of its walled neighbours, preferring neighbours that are dead ends too.
+    ratio=1.0 removes every dead end. Returns the number of walls removed.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    rng = rng if rng is not None else random
+    dead_ends = [block for block in grid if is_dead_end(grid, block)]
+    rng.shuffle(dead_ends)
+    no_of_removed_walls = 0
+    for block in dead_ends:
+        # A dead end may have been connected already by removing a dead end next to it.
+        if not is_dead_end(grid, block) or rng.random() >= ratio:
+            continue
+        neighbours = walled_neighbours(grid, block)
+        if not neighbours:
+            continue  # Only possible in a grid one block wide
+        dead_end_neighbours = [neighbour for neighbour in neighbours if is_dead_end(grid, neighbour)]
+        block.remove_wall_between_two_blocks(rng.choice(dead_end_neighbours or neighbours))
+        no_of_removed_walls += 1
+    return no_of_removed_walls
+
+
+def remove_random_walls(grid, count, rng=None):
+    """Removes up to count walls between adjacent blocks chosen at random, opening up rooms
+    when count is large compared to the number of blocks. Returns the number of walls removed.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    rng = rng if rng is not None else random
+    no_of_removed_walls = 0
+    for _ in range(count):
+        block = grid[rng.randrange(len(grid))]
+        neighbours = walled_neighbours(grid, block)
+        if neighbours:
+            block.remove_wall_between_two_blocks(rng.choice(neighbours))
+            no_of_removed_walls += 1
+    return no_of_removed_walls
@@ -0,0 +1,75 @@
+import random
+
+from stepping import SteppingAlgorithm
+
+
+class BinaryTree(SteppingAlgorithm):
+    """Used to build a maze using the binary tree algorithm.
+    Every block removes either its north or its east wall, so the maze is built in a single pass
+    without any additional memory. Every iteration carves one block.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    def __init__(self, grid, rng=None):
+        self.grid = grid
+        self.rng = rng if rng is not None else random
+        self.no_of_columns = grid[-1].x_index + 1
+        self.index = 0
+
+    def iterate(self):
+        """1. Stop iterating if every block has been carved.
+        2. Remove the north or the east wall of the current block chosen randomly from the available ones.
+            Blocks of the first row can only remove the east wall and blocks of the last column the north wall.
+        3. Continue with next iteration."""
+        if self.index == len(self.grid):
+            return True
+        block = self.grid[self.index]
+        can_go_north = block.y_index != 0
+        can_go_east = block.x_index != self.no_of_columns - 1
+        if can_go_north and (not can_go_east or self.rng.random() < 0.5):
+            block.remove_wall_between_two_blocks(self.grid[self.index - self.no_of_columns])
+        elif can_go_east:
+            block.remove_wall_between_two_blocks(self.grid[self.index + 1])
+        block.visited = True
+        self.index += 1
+        return self.index == len(self.grid)
+
+    def result(self):
+        return self.grid
+
+
+class Sidewinder(SteppingAlgorithm):
+    """Used to build a maze using the sidewinder algorithm.
+    Blocks of a row are grouped into runs by removing east walls and every run removes the north wall
+    of one randomly chosen block. The first row is a single corridor. Every iteration carves one block.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    def __init__(self, grid, rng=None):
+        self.grid = grid
+        self.rng = rng if rng is not None else random
+        self.no_of_columns = grid[-1].x_index + 1
+        self.index = 0
+        self.run_start = 0
+
+    def iterate(self):
+        """1. Stop iterating if every block has been carved.
+        2. Add the current block to the run.
+        3. If the block is in the first row, or isn't the last one in its row and the run randomly continues,
+            remove the east wall of the block.
+        4. Otherwise close the run: remove the north wall of a random block of the run (not in the first row)
+            and start a new run from the next block.
+        5. Continue with next iteration."""
+        if self.index == len(self.grid):
+            return True
+        block = self.grid[self.index]
+        is_last_in_row = block.x_index == self.no_of_columns - 1
+        if not is_last_in_row and (block.y_index == 0 or self.rng.random() < 0.5):
+            block.remove_wall_between_two_blocks(self.grid[self.index + 1])
+        else:
+            if block.y_index != 0:
+                run_index = self.rng.randrange(self.run_start, self.index + 1)
+                self.grid[run_index].remove_wall_between_two_blocks(self.grid[run_index - self.no_of_columns])
+            self.run_start = self.index + 1
+        block.visited = True
+        self.index += 1
+        return self.index == len(self.grid)
+
+    def result(self):
+        return self.grid
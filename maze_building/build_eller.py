@@ -0,0 +1,85 @@
+import random
+
+from data_types.disjoint_set import DisjointSet
+from grid_block.compact_grid import CompactGrid, ALL_WALLS, WALL_N, WALL_E, WALL_S, WALL_W
+from stepping import SteppingAlgorithm
+
+
+def generate_rows(no_of_columns, no_of_rows=None, rng=None):
+    """Generates a maze row by row using Eller's algorithm and yields wall masks of every finished row
+    as a bytearray of 4-bit masks (see grid_block.compact_grid).
+    Only the current row is kept in memory, so if no_of_rows is None rows are generated forever.
+    rng is a random.Random instance, the random module is used if it is omitted.
+    1. Blocks not connected to the row above start in their own set.
+    2. Randomly remove walls between adjacent blocks of different sets and join their sets.
+        In the last row remove walls between all adjacent blocks of different sets.
+    3. Randomly remove south walls of blocks, at least one block of every set,
+        so every set continues in the next row. Skipped in the last row."""
+    rng = rng if rng is not None else random
+    labels = [None] * no_of_columns  # Labels of sets carried from the row above, None for a new set
+    y_index = 0
+    while no_of_rows is None or y_index < no_of_rows:
+        is_last_row = no_of_rows is not None and y_index == no_of_rows - 1
+        walls = bytearray([ALL_WALLS]) * no_of_columns
+        row_set = DisjointSet(no_of_columns)
+        first_positions = {}
+        for x_index, label in enumerate(labels):
+            if label is None:
+                continue
+            walls[x_index] &= ~WALL_N
+            if label in first_positions:
+                row_set.union(first_positions[label], x_index)
+            else:
+                first_positions[label] = x_index
+
+        for x_index in range(no_of_columns - 1):
+            if (is_last_row or rng.random() < 0.5) and row_set.union(x_index, x_index + 1):
+                walls[x_index] &= ~WALL_E
+                walls[x_index + 1] &= ~WALL_W
+
+        if not is_last_row:
+            sets = {}
+            for x_index in range(no_of_columns):
+                sets.setdefault(row_set.find(x_index), []).append(x_index)
+            labels = [None] * no_of_columns
+            for root, members in sets.items():
+                carved = [x_index for x_index in members if rng.random() < 0.5] or [rng.choice(members)]
+                for x_index in carved:
+                    walls[x_index] &= ~WALL_S
+                    labels[x_index] = root
+        yield walls
+        y_index += 1
+
+
+class Eller(SteppingAlgorithm):
+    """Used to build a maze using Eller's algorithm. Every iteration generates one row of the grid.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    def __init__(self, grid, rng=None):
+        self.grid = grid
+        self.no_of_columns = grid[-1].x_index + 1
+        self.no_of_rows = grid[-1].y_index + 1
+        self.rows = generate_rows(self.no_of_columns, self.no_of_rows, rng)
+        self.y_index = 0
+
+    def iterate(self):
+        """1. Generate the next row with Eller's algorithm.
+        2. Copy its walls to the blocks of the row and mark them as visited.
+        3. Stop iterating when the last row has been generated.
+        4. Continue with next iteration."""
+        if self.y_index == self.no_of_rows:
+            return True
+        walls = next(self.rows)
+        row_start = self.y_index * self.no_of_columns
+        if isinstance(self.grid, CompactGrid):
+            self.grid.walls[row_start:row_start + self.no_of_columns] = walls
+        for x_index, wall_mask in enumerate(walls):
+            block = self.grid[row_start + x_index]
+            if not isinstance(self.grid, CompactGrid):
+                block.wall.n, block.wall.e = bool(wall_mask & WALL_N), bool(wall_mask & WALL_E)
+                block.wall.s, block.wall.w = bool(wall_mask & WALL_S), bool(wall_mask & WALL_W)
+            block.visited = True
+        self.y_index += 1
+        return self.y_index == self.no_of_rows
+
+    def result(self):
+        return self.grid
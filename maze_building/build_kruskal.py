@@ -0,0 +1,45 @@
+import random
+
+from data_types.disjoint_set import DisjointSet
+from stepping import SteppingAlgorithm
+
+
+class RandomizedKruskal(SteppingAlgorithm):
+    """Used to build a maze using randomized Kruskal's algorithm.
+    Every inner wall is an edge between two blocks. Edges are encoded as integers (grid index * 2 for the east wall
+    and grid index * 2 + 1 for the south wall) and blocks connected by a path are kept in a DisjointSet.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    def __init__(self, grid, rng=None):
+        self.grid = grid
+        self.rng = rng if rng is not None else random
+        self.no_of_columns = grid[-1].x_index + 1
+        no_of_rows = grid[-1].y_index + 1
+        self.edges = [index * 2 for index in range(len(grid)) if index % self.no_of_columns != self.no_of_columns - 1]
+        self.edges += [index * 2 + 1 for index in range(len(grid) - self.no_of_columns)] if no_of_rows > 1 else []
+        self.rng.shuffle(self.edges)
+        self.disjoint_set = DisjointSet(len(grid))
+        self.remaining_joins = len(grid) - 1
+        self.grid[0].visited = True  # Visited by a join anyway unless it is the only block
+
+    def iterate(self):
+        """1. Take the next edge from the shuffled list of edges.
+        2. If blocks on both sides of the edge are not connected yet:
+            a) Join their sets.
+            b) Remove walls between them and mark them as visited.
+        3. Stop iterating when every block has been connected (number of blocks - 1 joins).
+        4. Continue with next iteration."""
+        if not self.remaining_joins:
+            return True
+        edge = self.edges.pop()
+        index = edge >> 1
+        other_index = index + (self.no_of_columns if edge & 1 else 1)
+        if self.disjoint_set.union(index, other_index):
+            block, other_block = self.grid[index], self.grid[other_index]
+            block.remove_wall_between_two_blocks(other_block)
+            block.visited = True
+            other_block.visited = True
+            self.remaining_joins -= 1
+        return not self.remaining_joins
+
+    def result(self):
+        return self.grid
@@ -0,0 +1,57 @@
+import random
+
+from stepping import SteppingAlgorithm
+
+
+class RandomizedPrim(SteppingAlgorithm):
+    """Used to build a maze using randomized Prim's algorithm.
+    The frontier holds grid indices of not visited blocks adjacent to the maze.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    def __init__(self, grid, rng=None):
+        self.grid = grid
+        self.rng = rng if rng is not None else random
+        self.no_of_columns = grid[-1].x_index + 1
+        self.no_of_rows = grid[-1].y_index + 1
+        self.in_maze = bytearray(len(grid))
+        self.in_frontier = bytearray(len(grid))
+        self.frontier = []
+        self.add_to_maze(0)
+
+    def neighbour_indices(self, index):
+        x_index, y_index = index % self.no_of_columns, index // self.no_of_columns
+        if y_index != 0:
+            yield index - self.no_of_columns
+        if x_index != self.no_of_columns - 1:
+            yield index + 1
+        if y_index != self.no_of_rows - 1:
+            yield index + self.no_of_columns
+        if x_index != 0:
+            yield index - 1
+
+    def add_to_maze(self, index):
+        self.in_maze[index] = 1
+        self.grid[index].visited = True
+        for neighbour_index in self.neighbour_indices(index):
+            if not self.in_maze[neighbour_index] and not self.in_frontier[neighbour_index]:
+                self.in_frontier[neighbour_index] = 1
+                self.frontier.append(neighbour_index)
+
+    def iterate(self):
+        """1. Stop iterating if the frontier is empty.
+        2. Remove a random block from the frontier (swap it with the last one to remove it in O(1)).
+        3. Randomly choose one of its neighbours that is already a part of the maze and remove walls between them.
+        4. Add the block to the maze and its not visited neighbours to the frontier.
+        5. Continue with next iteration."""
+        if not self.frontier:
+            return True
+        position = self.rng.randrange(len(self.frontier))
+        self.frontier[position], self.frontier[-1] = self.frontier[-1], self.frontier[position]
+        index = self.frontier.pop()
+        maze_neighbours = [neighbour_index for neighbour_index in self.neighbour_indices(index)
+                           if self.in_maze[neighbour_index]]
+        self.grid[index].remove_wall_between_two_blocks(self.grid[self.rng.choice(maze_neighbours)])
+        self.add_to_maze(index)
+        return not self.frontier
+
+    def result(self):
+        return self.grid
@@ -0,0 +1,70 @@
+import random
+from array import array
+
+from stepping import SteppingAlgorithm
+
+
+class Wilson(SteppingAlgorithm):
+    """Used to build a maze using Wilson's algorithm (loop-erased random walks).
+    Generates a uniformly random maze. Every iteration makes one step of a random walk.
+    rng is a random.Random instance, the random module is used if it is omitted."""
+    def __init__(self, grid, rng=None):
+        self.grid = grid
+        self.rng = rng if rng is not None else random
+        self.no_of_columns = grid[-1].x_index + 1
+        self.no_of_rows = grid[-1].y_index + 1
+        self.in_maze = bytearray(len(grid))
+        # Stores at the grid index of a walked block the grid index of the block the walk moved to from there.
+        # Overwriting it when the walk comes back to a block erases the loop.
+        self.next_indices = array("i" if len(grid) < 2 ** 31 else "q", [-1]) * len(grid)
+        self.walk_start = None
+        self.current_index = None
+        self.next_start_candidate = 0
+        self.in_maze[0] = 1
+        self.grid[0].visited = True
+
+    def random_neighbour_index(self, index):
+        x_index, y_index = index % self.no_of_columns, index // self.no_of_columns
+        neighbours = []
+        if y_index != 0:
+            neighbours.append(index - self.no_of_columns)
+        if x_index != self.no_of_columns - 1:
+            neighbours.append(index + 1)
+        if y_index != self.no_of_rows - 1:
+            neighbours.append(index + self.no_of_columns)
+        if x_index != 0:
+            neighbours.append(index - 1)
+        return self.rng.choice(neighbours)
+
+    def iterate(self):
+        """1. If there is no walk in progress start it from the next block that is not a part of the maze.
+            Stop iterating if there is no such block.
+        2. Move to a random neighbour and remember the move made from the current block.
+        3. If the neighbour is a part of the maze follow remembered moves from the start of the walk,
+            removing walls and adding blocks to the maze.
+        4. Continue with next iteration."""
+        if self.walk_start is None:
+            while self.next_start_candidate < len(self.grid) and self.in_maze[self.next_start_candidate]:
+                self.next_start_candidate += 1
+            if self.next_start_candidate == len(self.grid):
+                return True
+            self.walk_start = self.current_index = self.next_start_candidate
+
+        next_index = self.random_neighbour_index(self.current_index)
+        self.next_indices[self.current_index] = next_index
+        self.current_index = next_index
+        if not self.in_maze[next_index]:
+            return False
+
+        index = self.walk_start
+        while not self.in_maze[index]:
+            next_index = self.next_indices[index]
+            self.grid[index].remove_wall_between_two_blocks(self.grid[next_index])
+            self.in_maze[index] = 1
+            self.grid[index].visited = True
+            index = next_index
+        self.walk_start = None
+        return False
+
+    def result(self):
+        return self.grid
@@ -0,0 +1,30 @@
+from maze_building.build_binary_tree import BinaryTree, Sidewinder
+from maze_building.build_dfs import RandomizedDepthFirstSearch
+from maze_building.build_eller import Eller
+from maze_building.build_kruskal import RandomizedKruskal
+from maze_building.build_prim import RandomizedPrim
+from maze_building.build_wilson import Wilson
+
+# Maps names of generating algorithms to classes taking (grid, rng=None) and exposing iterate(), step() and run().
+GENERATING_ALGORITHMS = {
+    "dfs": RandomizedDepthFirstSearch,
+    "kruskal": RandomizedKruskal,
+    "prim": RandomizedPrim,
+    "eller": Eller,
+    "wilson": Wilson,
+    "binary_tree": BinaryTree,
+    "sidewinder": Sidewinder,
+}
+
+
+def register_generating_algorithm(name, algorithm_class):
+    """Makes a generating algorithm available under the given name, e.g. in the command line interface."""
+    GENERATING_ALGORITHMS[name] = algorithm_class
+
+
+def get_generating_algorithm(name):
+    try:
+        return GENERATING_ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"Unknown generating algorithm {name!r}, "
+                         f"choose one of: {', '.join(sorted(GENERATING_ALGORITHMS))}") from None
@@ -1,22 +1,38 @@
-from data_types.priority_queue import PriorityQueue
-from maze_solving.utils import reset_grid, build_shortest_path
+from grid_block.compact_grid import WALL_N, WALL_E, WALL_S, WALL_W
+from maze_solving.search_context import SearchContext
+from stepping import SteppingAlgorithm
 
 
-class AStar:
-    """Used to solve a maze using A* algorithm."""
-    def __init__(self, grid, start_block, goal_block):
+class AStar(SteppingAlgorithm):
+    """Used to solve a maze using A* algorithm.
+    Works on grid indices (no_of_columns * y_index + x_index) instead of blocks.
+    Passing a SearchContext shared by many searches on the same maze avoids work proportional to its size."""
+    def __init__(self, grid, start_block, goal_block, context=None):
         self.current_block = None
+        self.path = None
         self.grid = grid
         self.start_block = start_block
         self.goal_block = goal_block
-        self.p_queue = PriorityQueue()
-        self.p_queue.put(self.start_block, 0)  # Put the starting block to the priority queue
-        self.g_values = {self.start_block.indices: 0}
-        # Predecessors are used to keep track of discovered neighbours and to build the shortest path.
-        # It stores the key, value pairs of indices of discovered neighbour
-        # and indices of block that discover such a neighbour
-        self.predecessors = {start_block.indices: (-1, -1)}
-        reset_grid(self.grid)
+        self.no_of_columns = grid[-1].x_index + 1
+        self.context = context if context is not None else SearchContext(grid)
+        self.base = self.context.begin()
+        self.walls = self.context.walls
+        self.neighbour_offsets = ((WALL_N, -self.no_of_columns), (WALL_E, 1),
+                                  (WALL_S, self.no_of_columns), (WALL_W, -1))
+        self.start_index = start_block.y_index * self.no_of_columns + start_block.x_index
+        self.goal_index = goal_block.y_index * self.no_of_columns + goal_block.x_index
+        self.open_set = self.context.open_set
+        h_value = self.manhattan_distance(self.goal_block, self.start_block)
+        self.open_set.put(self.start_index, h_value, h_value)  # Put the starting block to the open set
+        # g values store at the grid index the number of steps needed to reach that block from the starting block.
+        # Predecessors are used to build the shortest path.
+        # It is a flat array storing at the grid index of a discovered neighbour
+        # the grid index of block that discover such a neighbour.
+        # Predecessors are stamped with the epoch of this search (base + grid index, see SearchContext),
+        # so a block has been discovered iff its predecessor is at least base. g values are valid only for such blocks.
+        self.g_values, self.predecessors = self.context.g_values, self.context.predecessors
+        self.g_values[self.start_index] = 0
+        self.predecessors[self.start_index] = self.base + self.start_index
 
     @staticmethod
     def manhattan_distance(block, other_block):
@@ -25,35 +41,43 @@ class AStar:
         return abs(x1 - x2) + abs(y1 - y2)
 
     def iterate(self):
-        """1. Get an element from the priority queue.
+        """1. Get an element from the open set.
         2. Mark the current block as visited.
         3. Check if the current block is the goal block. Stop iterating if it is.
         4. Look for valid neighbours.
-        5. For every neighbour found check if it has already been discovered (by checking predecessors)
-            and if it hasn't been discovered yet:
-            a) Calculate g value which indicates the steps needed to reach the starting block from that neighbour
-                and store it.
+        5. For every neighbour found calculate g value which indicates the steps needed to reach that neighbour
+            from the starting block and if that neighbour hasn't been discovered yet or g value is lower
+            than the stored one:
+            a) Store g value.
             b) Calculate h value which indicates the distance between that neighbour and the goal block
                 using Manhattan Distance.
             c) Calculate f value which indicates priority value.
-            d) Put that neighbour with calculated f value to the priority queue.
-            e) Add that neighbour to the predecessors dictionary to know it has been discovered
-                and to store information about block that discovered it.
+            d) Put that neighbour with calculated f and h values to the open set.
+                An entry put earlier for that neighbour becomes stale and is skipped by the open set.
+            e) Store the current block as the predecessor of that neighbour
+                to be able to build the shortest path.
         6. Continue with next iteration."""
-
-        self.current_block = self.p_queue.get()
-        self.current_block.visited = True
-        if self.current_block == self.goal_block:
-            build_shortest_path(self.grid, self.predecessors, self.start_block, self.goal_block)
+        current_index = self.open_set.get()
+        if self.visualize:
+            self.current_block = self.context.mark_visited(current_index)
+        if current_index == self.goal_index:
+            self.path = self.context.build_shortest_path(self.start_index, self.goal_index)
             return True
 
-        neighbours = self.current_block.determine_valid_neighbours(self.grid)
-        for neighbour in neighbours:
-            if neighbour.indices not in self.predecessors:
-                g_value = self.g_values[self.current_block.indices] + 1
-                self.g_values[neighbour.indices] = g_value
-                h_value = self.manhattan_distance(self.goal_block, neighbour)
-                f_value = g_value + h_value
-                self.p_queue.put(neighbour, f_value)
-                self.predecessors[neighbour.indices] = self.current_block.indices
+        no_of_columns = self.no_of_columns
+        goal_x, goal_y = self.goal_index % no_of_columns, self.goal_index // no_of_columns
+        g_values, predecessors, base = self.g_values, self.predecessors, self.base
+        g_value = g_values[current_index] + 1
+        walls = self.walls[current_index]
+        for wall, offset in self.neighbour_offsets:
+            neighbour_index = current_index + offset
+            if not walls & wall and (predecessors[neighbour_index] < base or g_value < g_values[neighbour_index]):
+                g_values[neighbour_index] = g_value
+                h_value = abs(neighbour_index % no_of_columns - goal_x) + abs(neighbour_index // no_of_columns - goal_y)
+                self.open_set.put(neighbour_index, g_value + h_value, h_value)
+                predecessors[neighbour_index] = base + current_index
         return False
+
+    def result(self):
+        """Returns the shortest path found as a list of blocks from the starting block to the goal block."""
+        return self.path
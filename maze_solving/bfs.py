@@ -1,21 +1,35 @@
 from data_types.my_queue import Queue
-from maze_solving.utils import reset_grid, build_shortest_path
+from grid_block.compact_grid import WALL_N, WALL_E, WALL_S, WALL_W
+from maze_solving.search_context import SearchContext
+from stepping import SteppingAlgorithm
 
 
-class BreadthFirstSearch:
-    """Used to solve a maze using Breadth First Search algorithm."""
-    def __init__(self, grid, start_block, goal_block):
+class BreadthFirstSearch(SteppingAlgorithm):
+    """Used to solve a maze using Breadth First Search algorithm.
+    Works on grid indices (no_of_columns * y_index + x_index) instead of blocks.
+    Passing a SearchContext shared by many searches on the same maze avoids work proportional to its size."""
+    def __init__(self, grid, start_block, goal_block, context=None):
         self.current_block = None
+        self.path = None
         self.grid = grid
         self.start_block = start_block
         self.goal_block = goal_block
+        self.no_of_columns = grid[-1].x_index + 1
+        self.context = context if context is not None else SearchContext(grid)
+        self.base = self.context.begin()
+        self.walls = self.context.walls
+        self.neighbour_offsets = ((WALL_N, -self.no_of_columns), (WALL_E, 1),
+                                  (WALL_S, self.no_of_columns), (WALL_W, -1))
+        self.start_index = start_block.y_index * self.no_of_columns + start_block.x_index
+        self.goal_index = goal_block.y_index * self.no_of_columns + goal_block.x_index
         self.queue = Queue()
-        self.queue.enqueue(self.start_block)  # Enqueue the starting block to the queue
+        self.queue.enqueue(self.start_index)  # Enqueue the starting block to the queue
         # Predecessors are used to keep track of discovered neighbours and to build the shortest path.
-        # It stores the key, value pairs of indices of discovered neighbour
-        # and indices of block that discover such a neighbour
-        self.predecessors = {start_block.indices: (-1, -1)}
-        reset_grid(self.grid)
+        # It is a flat array storing at the grid index of a discovered neighbour the grid index of block
+        # that discover such a neighbour, stamped with the epoch of this search by adding base (see SearchContext),
+        # so a block has been discovered iff its predecessor is at least base.
+        self.predecessors = self.context.predecessors
+        self.predecessors[self.start_index] = self.base + self.start_index
 
     def iterate(self):
         """1. Dequeue an element from the queue.
@@ -25,18 +39,68 @@ class BreadthFirstSearch:
         5. For every neighbour found check if it has already been discovered (by checking predecessors)
             and if it hasn't been discovered yet:
             a) Enqueue that neighbour to the queue.
-            b) Add that neighbour to the predecessors dictionary to know it has been discovered
+            b) Add that neighbour to the predecessors array to know it has been discovered
                 and to store information about block that discovered it.
         6. Continue with next iteration."""
-        self.current_block = self.queue.dequeue()
-        self.current_block.visited = True
-        if self.current_block == self.goal_block:
-            build_shortest_path(self.grid, self.predecessors, self.start_block, self.goal_block)
+        current_index = self.queue.dequeue()
+        if self.visualize:
+            self.current_block = self.context.mark_visited(current_index)
+        if current_index == self.goal_index:
+            self.path = self.context.build_shortest_path(self.start_index, self.goal_index)
             return True
 
-        neighbours = self.current_block.determine_valid_neighbours(self.grid)
-        for neighbour in neighbours:
-            if neighbour.indices not in self.predecessors:
-                self.queue.enqueue(neighbour)
-                self.predecessors[neighbour.indices] = self.current_block.indices
+        predecessors, base = self.predecessors, self.base
+        walls = self.walls[current_index]
+        for wall, offset in self.neighbour_offsets:
+            neighbour_index = current_index + offset
+            if not walls & wall and predecessors[neighbour_index] < base:
+                self.queue.enqueue(neighbour_index)
+                predecessors[neighbour_index] = base + current_index
         return False
+
+    def run(self):
+        """Runs Breadth First Search to completion in a tight loop over grid indices without visualization.
+        Returns the shortest path found."""
+        if self.is_finished:
+            return self.result()
+        items = self.queue.items
+        dequeue, enqueue = items.popleft, items.append
+        predecessors, base = self.predecessors, self.base
+        walls, goal_index = self.walls, self.goal_index
+        no_of_columns = self.no_of_columns
+        steps = 0
+        while True:
+            current_index = dequeue()
+            steps += 1
+            if current_index == goal_index:
+                break
+            current_walls = walls[current_index]
+            stamped_index = base + current_index
+            if not current_walls & WALL_N:
+                neighbour_index = current_index - no_of_columns
+                if predecessors[neighbour_index] < base:
+                    predecessors[neighbour_index] = stamped_index
+                    enqueue(neighbour_index)
+            if not current_walls & WALL_E:
+                neighbour_index = current_index + 1
+                if predecessors[neighbour_index] < base:
+                    predecessors[neighbour_index] = stamped_index
+                    enqueue(neighbour_index)
+            if not current_walls & WALL_S:
+                neighbour_index = current_index + no_of_columns
+                if predecessors[neighbour_index] < base:
+                    predecessors[neighbour_index] = stamped_index
+                    enqueue(neighbour_index)
+            if not current_walls & WALL_W:
+                neighbour_index = current_index - 1
+                if predecessors[neighbour_index] < base:
+                    predecessors[neighbour_index] = stamped_index
+                    enqueue(neighbour_index)
+        self.path = self.context.build_shortest_path(self.start_index, goal_index)
+        self.steps_taken += steps
+        self.is_finished = True
+        return self.path
+
+    def result(self):
+        """Returns the shortest path found as a list of blocks from the starting block to the goal block."""
+        return self.path
@@ -0,0 +1,202 @@
+from collections import deque
+
+from data_types.priority_queue import AStarOpenSet
+from grid_block.compact_grid import WALL_N, WALL_E, WALL_S, WALL_W
+from maze_solving.utils import reset_grid, get_wall_masks, create_index_array, build_shortest_path_from_indices
+from stepping import SteppingAlgorithm
+
+FORWARD, BACKWARD = 0, 1
+
+
+def build_bidirectional_path(grid, predecessors, start_index, goal_index, meeting):
+    """Used to build the shortest path found by a bidirectional search.
+    predecessors is a pair of forward (from the starting block) and backward (from the goal block) predecessors
+    and meeting a pair of grid indices where both searches met: the same block or two adjacent blocks.
+    Returns the path as a list of blocks from the starting block to the goal block."""
+    forward_index, backward_index = meeting
+    path = build_shortest_path_from_indices(grid, predecessors[FORWARD], start_index, forward_index)
+    backward_path = build_shortest_path_from_indices(grid, predecessors[BACKWARD], goal_index, backward_index)
+    if forward_index == backward_index:
+        backward_path.pop()
+    path.extend(reversed(backward_path))
+    return path
+
+
+class BidirectionalBreadthFirstSearch(SteppingAlgorithm):
+    """Used to solve a maze using Breadth First Search from both the starting and the goal block at once.
+    Every iteration expands one block from the side with the smaller queue. When a block is expanded,
+    paths through it and its neighbours already discovered by the other side are candidates for the shortest path.
+    The search stops when the shortest candidate is not longer than the sum of distances of blocks
+    at the front of both queues, so it expands about two balls of half the radius instead of one.
+    Works on grid indices (no_of_columns * y_index + x_index) instead of blocks."""
+    def __init__(self, grid, start_block, goal_block):
+        self.current_block = None
+        self.path = None
+        self.grid = grid
+        self.start_block = start_block
+        self.goal_block = goal_block
+        self.no_of_columns = grid[-1].x_index + 1
+        self.walls = get_wall_masks(grid)
+        self.neighbour_offsets = ((WALL_N, -self.no_of_columns), (WALL_E, 1),
+                                  (WALL_S, self.no_of_columns), (WALL_W, -1))
+        self.start_index = start_block.y_index * self.no_of_columns + start_block.x_index
+        self.goal_index = goal_block.y_index * self.no_of_columns + goal_block.x_index
+        self.queues = (deque([self.start_index]), deque([self.goal_index]))
+        # Distances from the starting block (forward) and from the goal block (backward), -1 means not discovered.
+        self.distances = (create_index_array(len(grid)), create_index_array(len(grid)))
+        self.predecessors = (create_index_array(len(grid)), create_index_array(len(grid)))
+        for side, index in ((FORWARD, self.start_index), (BACKWARD, self.goal_index)):
+            self.distances[side][index] = 0
+            self.predecessors[side][index] = index
+        self.best_length = float("inf")  # Number of steps of the shortest path found so far
+        self.meeting = None
+        reset_grid(self.grid)
+
+    def iterate(self):
+        """1. Stop iterating if either queue is empty or the shortest path found so far is not longer
+            than the sum of distances of blocks at the front of both queues, and build the path.
+        2. Dequeue a block from the side with the smaller queue and mark it as visited.
+        3. If the other side has discovered that block, check if the path through it is the shortest one.
+        4. For every valid neighbour:
+            a) If the other side has discovered it, check if the path through both blocks is the shortest one.
+            b) If this side hasn't discovered it yet, enqueue it and store its distance and predecessor.
+        5. Continue with next iteration."""
+        forward_queue, backward_queue = self.queues
+        if not forward_queue or not backward_queue or \
+                self.distances[FORWARD][forward_queue[0]] + self.distances[BACKWARD][backward_queue[0]] \
+                >= self.best_length:
+            if self.meeting is not None:
+                self.path = build_bidirectional_path(self.grid, self.predecessors, self.start_index,
+                                                     self.goal_index, self.meeting)
+            return True
+
+        side = FORWARD if len(forward_queue) <= len(backward_queue) else BACKWARD
+        other_side = 1 - side
+        current_index = self.queues[side].popleft()
+        if self.visualize:
+            self.current_block = self.grid[current_index]
+            self.current_block.visited = True
+        distances, other_distances = self.distances[side], self.distances[other_side]
+        predecessors = self.predecessors[side]
+        distance = distances[current_index]
+        if other_distances[current_index] >= 0 and distance + other_distances[current_index] < self.best_length:
+            self.best_length = distance + other_distances[current_index]
+            self.meeting = (current_index, current_index)
+
+        walls = self.walls[current_index]
+        for wall, offset in self.neighbour_offsets:
+            if walls & wall:
+                continue
+            neighbour_index = current_index + offset
+            if other_distances[neighbour_index] >= 0 and \
+                    distance + 1 + other_distances[neighbour_index] < self.best_length:
+                self.best_length = distance + 1 + other_distances[neighbour_index]
+                self.meeting = (current_index, neighbour_index) if side == FORWARD else \
+                    (neighbour_index, current_index)
+            if distances[neighbour_index] < 0:
+                distances[neighbour_index] = distance + 1
+                predecessors[neighbour_index] = current_index
+                self.queues[side].append(neighbour_index)
+        return False
+
+    def result(self):
+        """Returns the shortest path found as a list of blocks from the starting block to the goal block."""
+        return self.path
+
+
+class BidirectionalAStar(SteppingAlgorithm):
+    """Used to solve a maze using A* from both the starting and the goal block at once.
+    The forward search is guided by Manhattan Distance to the goal block and the backward one
+    by Manhattan Distance to the starting block. Every iteration expands one block from the side
+    with the smaller open set. Candidates for the shortest path are found like in BidirectionalBreadthFirstSearch
+    and the search stops when the shortest candidate is not longer than the larger of the lowest f values
+    of both open sets, which is a lower bound of any path not found yet as Manhattan Distance is consistent.
+    Works on grid indices (no_of_columns * y_index + x_index) instead of blocks."""
+    def __init__(self, grid, start_block, goal_block):
+        self.current_block = None
+        self.path = None
+        self.grid = grid
+        self.start_block = start_block
+        self.goal_block = goal_block
+        self.no_of_columns = grid[-1].x_index + 1
+        self.walls = get_wall_masks(grid)
+        self.neighbour_offsets = ((WALL_N, -self.no_of_columns), (WALL_E, 1),
+                                  (WALL_S, self.no_of_columns), (WALL_W, -1))
+        self.start_index = start_block.y_index * self.no_of_columns + start_block.x_index
+        self.goal_index = goal_block.y_index * self.no_of_columns + goal_block.x_index
+        # Each side is guided towards the block the other side starts from.
+        self.targets = (self.goal_index, self.start_index)
+        self.open_sets = (AStarOpenSet(len(grid)), AStarOpenSet(len(grid)))
+        # g values of both sides, -1 means not discovered yet.
+        self.g_values = (create_index_array(len(grid)), create_index_array(len(grid)))
+        self.predecessors = (create_index_array(len(grid)), create_index_array(len(grid)))
+        h_value = self.manhattan_distance(self.goal_block, self.start_block)
+        for side, index in ((FORWARD, self.start_index), (BACKWARD, self.goal_index)):
+            self.open_sets[side].put(index, h_value, h_value)
+            self.g_values[side][index] = 0
+            self.predecessors[side][index] = index
+        self.best_length = float("inf")  # Number of steps of the shortest path found so far
+        self.meeting = None
+        reset_grid(self.grid)
+
+    @staticmethod
+    def manhattan_distance(block, other_block):
+        x1, y1 = block.indices
+        x2, y2 = other_block.indices
+        return abs(x1 - x2) + abs(y1 - y2)
+
+    def iterate(self):
+        """1. Stop iterating if either open set is empty or the shortest path found so far is not longer
+            than the larger of the lowest f values of both open sets, and build the path.
+        2. Get a block from the side with the smaller open set and mark it as visited.
+        3. If the other side has discovered that block, check if the path through it is the shortest one.
+        4. For every valid neighbour:
+            a) If the other side has discovered it, check if the path through both blocks is the shortest one.
+            b) Calculate its g value and if it hasn't been discovered by this side yet or g value is lower
+                than the stored one, store g value and the predecessor and put it to the open set
+                with f value calculated using Manhattan Distance to the block the other side starts from.
+        5. Continue with next iteration."""
+        forward_open_set, backward_open_set = self.open_sets
+        if forward_open_set.is_empty() or backward_open_set.is_empty() or \
+                max(forward_open_set.peek_f_value(), backward_open_set.peek_f_value()) >= self.best_length:
+            if self.meeting is not None:
+                self.path = build_bidirectional_path(self.grid, self.predecessors, self.start_index,
+                                                     self.goal_index, self.meeting)
+            return True
+
+        side = FORWARD if len(forward_open_set) <= len(backward_open_set) else BACKWARD
+        other_side = 1 - side
+        current_index = self.open_sets[side].get()
+        if self.visualize:
+            self.current_block = self.grid[current_index]
+            self.current_block.visited = True
+        g_values, other_g_values = self.g_values[side], self.g_values[other_side]
+        predecessors = self.predecessors[side]
+        if other_g_values[current_index] >= 0 and \
+                g_values[current_index] + other_g_values[current_index] < self.best_length:
+            self.best_length = g_values[current_index] + other_g_values[current_index]
+            self.meeting = (current_index, current_index)
+
+        no_of_columns = self.no_of_columns
+        target_x, target_y = self.targets[side] % no_of_columns, self.targets[side] // no_of_columns
+        g_value = g_values[current_index] + 1
+        walls = self.walls[current_index]
+        for wall, offset in self.neighbour_offsets:
+            if walls & wall:
+                continue
+            neighbour_index = current_index + offset
+            if other_g_values[neighbour_index] >= 0 and g_value + other_g_values[neighbour_index] < self.best_length:
+                self.best_length = g_value + other_g_values[neighbour_index]
+                self.meeting = (current_index, neighbour_index) if side == FORWARD else \
+                    (neighbour_index, current_index)
+            if g_values[neighbour_index] < 0 or g_value < g_values[neighbour_index]:
+                g_values[neighbour_index] = g_value
+                h_value = abs(neighbour_index % no_of_columns - target_x) + \
+                    abs(neighbour_index // no_of_columns - target_y)
+                self.open_sets[side].put(neighbour_index, g_value + h_value, h_value)
+                predecessors[neighbour_index] = current_index
+        return False
+
+    def result(self):
+        """Returns the shortest path found as a list of blocks from the starting block to the goal block."""
+        return self.path
@@ -1,21 +1,33 @@
 from data_types.stack import Stack
-from maze_solving.utils import reset_grid, build_shortest_path
+from maze_solving.search_context import SearchContext
+from stepping import SteppingAlgorithm
 
 
-class DepthFirstSearch:
-    """Used to solve a maze using Depth First Search algorithm."""
-    def __init__(self, grid, start_block, goal_block):
+class DepthFirstSearch(SteppingAlgorithm):
+    """Used to solve a maze using Depth First Search algorithm.
+    Passing a SearchContext shared by many searches on the same maze avoids resetting the whole grid."""
+    def __init__(self, grid, start_block, goal_block, context=None):
         self.current_block = None
+        self.path = None
         self.grid = grid
         self.start_block = start_block
         self.goal_block = goal_block
+        self.no_of_columns = grid[-1].x_index + 1
         self.stack = Stack()
         self.stack.push(self.start_block)  # Push the starting block to the stack
+        self.context = context if context is not None else SearchContext(grid)
+        self.base = self.context.begin()
         # Predecessors are used to keep track of discovered neighbours and to build the shortest path.
-        # It stores the key, value pairs of indices of discovered neighbour
-        # and indices of block that discover such a neighbour
-        self.predecessors = {start_block.indices: (-1, -1)}
-        reset_grid(self.grid)
+        # It is a flat array storing at the grid index of a discovered neighbour the grid index of block
+        # that discover such a neighbour, stamped with the epoch of this search by adding base (see SearchContext),
+        # so a block has been discovered iff its predecessor is at least base.
+        self.predecessors = self.context.predecessors
+        self.start_index = self.grid_index(start_block)
+        self.goal_index = self.grid_index(goal_block)
+        self.predecessors[self.start_index] = self.base + self.start_index
+
+    def grid_index(self, block):
+        return block.y_index * self.no_of_columns + block.x_index
 
     def iterate(self):
         """1. Remove an element from the stack.
@@ -25,18 +37,26 @@ class DepthFirstSearch:
         5. For every neighbour found check if it has already been discovered (by checking predecessors)
             and if it hasn't been discovered yet:
             a) Push that neighbour to the stack.
-            b) Add that neighbour to the predecessors dictionary to know it has been discovered
+            b) Add that neighbour to the predecessors array to know it has been discovered
                 and to store information about block that discovered it.
         6. Continue with next iteration."""
         self.current_block = self.stack.pop()
-        self.current_block.visited = True
-        if self.current_block == self.goal_block:
-            build_shortest_path(self.grid, self.predecessors, self.start_block, self.goal_block)
+        current_index = self.grid_index(self.current_block)
+        if self.visualize:
+            self.context.mark_visited(current_index)
+        if current_index == self.goal_index:
+            self.path = self.context.build_shortest_path(self.start_index, self.goal_index)
             return True
 
+        predecessors, base = self.predecessors, self.base
         neighbours = self.current_block.determine_valid_neighbours(self.grid)
         for neighbour in neighbours:
-            if neighbour.indices not in self.predecessors:
+            neighbour_index = self.grid_index(neighbour)
+            if predecessors[neighbour_index] < base:
                 self.stack.push(neighbour)
-                self.predecessors[neighbour.indices] = self.current_block.indices
+                predecessors[neighbour_index] = base + current_index
         return False
+
+    def result(self):
+        """Returns the shortest path found as a list of blocks from the starting block to the goal block."""
+        return self.path
@@ -0,0 +1,392 @@
+import heapq
+from array import array
+
+from grid_block.compact_grid import WALL_N, WALL_E, WALL_S, WALL_W
+from maze_solving.utils import get_wall_masks, create_index_array
+from stepping import SteppingAlgorithm
+
+
+class MazeGraph:
+    """Adjacency of a maze precomputed once, to answer many shortest path queries on the same maze.
+    Blocks are connected in CSR form: neighbours of the block at a grid index are
+    targets[offsets[index]:offsets[index + 1]].
+    Straight and winding corridors are contracted: blocks with other than two open sides (dead ends and junctions)
+    become nodes and every corridor between two nodes becomes one weighted edge, so a search only visits nodes.
+    Blocks of a corridor are stored in order from its first node (corridor_first_nodes)
+    to its last node (corridor_last_nodes) to expand found paths back to grid indices."""
+    def __init__(self, grid):
+        self.no_of_columns = grid[-1].x_index + 1
+        self.size = len(grid)
+        self.offsets, self.targets = self.build_adjacency(get_wall_masks(grid))
+        self.build_contracted_graph()
+
+    def build_adjacency(self, walls):
+        no_of_columns = self.no_of_columns
+        offsets = create_index_array(self.size + 1, 0)
+        targets = create_index_array(0)
+        for index in range(self.size):
+            wall_mask = walls[index]
+            if not wall_mask & WALL_N:
+                targets.append(index - no_of_columns)
+            if not wall_mask & WALL_E:
+                targets.append(index + 1)
+            if not wall_mask & WALL_S:
+                targets.append(index + no_of_columns)
+            if not wall_mask & WALL_W:
+                targets.append(index - 1)
+            offsets[index + 1] = len(targets)
+        return offsets, targets
+
+    def neighbours(self, index):
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def degree(self, index):
+        return self.offsets[index + 1] - self.offsets[index]
+
+    def build_contracted_graph(self):
+        offsets, targets = self.offsets, self.targets
+        # Node id of every block, -1 for blocks inside a corridor
+        self.node_of_block = create_index_array(self.size)
+        self.node_blocks = create_index_array(0)  # Grid index of every node
+        for index in range(self.size):
+            if offsets[index + 1] - offsets[index] != 2:
+                self.node_of_block[index] = len(self.node_blocks)
+                self.node_blocks.append(index)
+
+        # Corridor id and position within the corridor of every block inside a corridor
+        self.corridor_of_block = create_index_array(self.size)
+        self.position_in_corridor = create_index_array(self.size)
+        self.corridor_blocks = create_index_array(0)
+        self.corridor_starts = create_index_array(1, 0)
+        self.corridor_first_nodes = create_index_array(0)
+        self.corridor_last_nodes = create_index_array(0)
+
+        for node in range(len(self.node_blocks)):
+            self.walk_corridors_from(node)
+        # Corridors forming a loop without any node: the first block of such a loop becomes a node.
+        for index in range(self.size):
+            if self.node_of_block[index] < 0 and self.corridor_of_block[index] < 0:
+                self.node_of_block[index] = len(self.node_blocks)
+                self.node_blocks.append(index)
+                self.walk_corridors_from(len(self.node_blocks) - 1)
+
+        # Contracted graph in CSR form: edges of a node are edge_targets, edge_weights and edge_corridors
+        # in range(node_offsets[node], node_offsets[node + 1]).
+        edges = [[] for _ in range(len(self.node_blocks))]
+        for corridor in range(len(self.corridor_first_nodes)):
+            first_node, last_node = self.corridor_first_nodes[corridor], self.corridor_last_nodes[corridor]
+            weight = self.corridor_starts[corridor + 1] - self.corridor_starts[corridor] + 1
+            edges[first_node].append((last_node, weight, corridor))
+            if last_node != first_node:
+                edges[last_node].append((first_node, weight, corridor))
+        self.node_offsets = create_index_array(len(self.node_blocks) + 1, 0)
+        self.edge_sources, self.edge_targets, self.edge_weights, self.edge_corridors = \
+            (create_index_array(0) for _ in range(4))
+        for node, node_edges in enumerate(edges):
+            for target, weight, corridor in node_edges:
+                self.edge_sources.append(node)
+                self.edge_targets.append(target)
+                self.edge_weights.append(weight)
+                self.edge_corridors.append(corridor)
+            self.node_offsets[node + 1] = len(self.edge_targets)
+        self.is_tree = self.no_of_edges == self.no_of_nodes - 1 and self.is_connected()
+
+    def is_connected(self):
+        """Checks if every node of the contracted graph can be reached from the first one."""
+        is_reached = bytearray(self.no_of_nodes)
+        is_reached[0] = True
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            for edge in range(self.node_offsets[node], self.node_offsets[node + 1]):
+                target = self.edge_targets[edge]
+                if not is_reached[target]:
+                    is_reached[target] = True
+                    stack.append(target)
+        return all(is_reached)
+
+    def walk_corridors_from(self, node):
+        """Follows every corridor leaving a node that hasn't been followed yet and stores it."""
+        offsets, targets = self.offsets, self.targets
+        node_block = self.node_blocks[node]
+        for position in range(offsets[node_block], offsets[node_block + 1]):
+            previous, current = node_block, targets[position]
+            if self.corridor_of_block[current] >= 0:
+                continue  # Already followed from its other end
+            if self.node_of_block[current] >= 0 and (self.node_of_block[current] < node or current == node_block):
+                continue  # Two adjacent nodes are connected once, from the node with the lower id
+            corridor = len(self.corridor_first_nodes)
+            while self.node_of_block[current] < 0:
+                self.corridor_of_block[current] = corridor
+                self.position_in_corridor[current] = len(self.corridor_blocks) - self.corridor_starts[corridor]
+                self.corridor_blocks.append(current)
+                first, second = targets[offsets[current]], targets[offsets[current] + 1]
+                previous, current = current, (second if first == previous else first)
+            self.corridor_first_nodes.append(node)
+            self.corridor_last_nodes.append(self.node_of_block[current])
+            self.corridor_starts.append(len(self.corridor_blocks))
+
+    @property
+    def no_of_nodes(self):
+        return len(self.node_blocks)
+
+    @property
+    def no_of_edges(self):
+        return len(self.corridor_first_nodes)
+
+    def corridor_length(self, corridor):
+        """Number of blocks inside a corridor, not counting nodes at its ends."""
+        return self.corridor_starts[corridor + 1] - self.corridor_starts[corridor]
+
+    def attachments(self, index):
+        """Returns nodes reachable from a block without passing any other node
+        as a list of (node, distance, corridor, is_from_first_node_side)."""
+        node = self.node_of_block[index]
+        if node >= 0:
+            return [(node, 0, -1, True)]
+        corridor = self.corridor_of_block[index]
+        position = self.position_in_corridor[index]
+        length = self.corridor_length(corridor)
+        return [(self.corridor_first_nodes[corridor], position + 1, corridor, True),
+                (self.corridor_last_nodes[corridor], length - position, corridor, False)]
+
+    def corridor_segment(self, corridor, start_position, stop_position):
+        """Grid indices of corridor blocks from start_position to stop_position, both included, in that order.
+        Positions -1 and the corridor length stand for its first and last node."""
+        start, length = self.corridor_starts[corridor], self.corridor_length(corridor)
+
+        def block_at(position):
+            if position < 0:
+                return self.node_blocks[self.corridor_first_nodes[corridor]]
+            if position >= length:
+                return self.node_blocks[self.corridor_last_nodes[corridor]]
+            return self.corridor_blocks[start + position]
+
+        step = 1 if stop_position >= start_position else -1
+        return [block_at(position) for position in range(start_position, stop_position + step, step)]
+
+    def shortest_path(self, start_index, goal_index):
+        """Returns the shortest path between two blocks as a list of grid indices."""
+        search = ContractedGraphSearch.from_indices(self, start_index, goal_index)
+        search.search()
+        return search.path_indices
+
+
+# Open nodes are kept on a heap as single integers: distance << NODE_BITS | node, which compare faster than tuples.
+NODE_BITS = 32
+NODE_MASK = (1 << NODE_BITS) - 1
+UNREACHED = 1 << 62
+START_EDGE = -2
+
+
+class ContractedGraphSearch(SteppingAlgorithm):
+    """Used to solve a maze with Dijkstra's algorithm on the contracted graph of a MazeGraph.
+    The graph can be built once and passed to many searches on the same maze, a search then only allocates
+    arrays proportional to the number of nodes and doesn't reset the grid.
+    Blocks are marked as visited and the path as revisited only when iterating with visualization on."""
+    def __init__(self, grid, start_block, goal_block, graph=None):
+        self.grid = grid
+        self.graph = graph if graph is not None else MazeGraph(grid)
+        no_of_columns = self.graph.no_of_columns
+        self.start_block = start_block
+        self.goal_block = goal_block
+        self.path = None
+        self.setup(start_block.y_index * no_of_columns + start_block.x_index,
+                   goal_block.y_index * no_of_columns + goal_block.x_index)
+
+    @classmethod
+    def from_indices(cls, graph, start_index, goal_index):
+        """Creates a search between two grid indices not bound to any grid, see MazeGraph.shortest_path."""
+        search = cls.__new__(cls)
+        search.grid = None
+        search.graph = graph
+        search.start_block = search.goal_block = search.path = None
+        search.setup(start_index, goal_index)
+        return search
+
+    def setup(self, start_index, goal_index):
+        graph = self.graph
+        self.start_index, self.goal_index = start_index, goal_index
+        self.path_indices = None
+        self.distances = array("q", [UNREACHED]) * graph.no_of_nodes
+        # Predecessor of a node is the edge of the contracted graph it has been reached through, -1 if not reached.
+        # Nodes reached directly from the start block have predecessor START_EDGE and are stored
+        # in start_attachments as node: (corridor or -1, is the corridor walked from its first to its last node).
+        self.predecessor_edges = create_index_array(graph.no_of_nodes)
+        self.start_attachments = {}
+        self.goal_attachments = {}  # node: (distance, corridor or -1, is the goal block on the first node side)
+        self.open_nodes = []
+        self.best_distance = UNREACHED
+        self.best_node = None  # Node the best path reaches the goal block from, -1 if it doesn't pass any node
+
+        for node, distance, corridor, is_first_side in graph.attachments(start_index):
+            if distance < self.distances[node]:
+                self.distances[node] = distance
+                self.predecessor_edges[node] = START_EDGE
+                self.start_attachments[node] = (corridor, not is_first_side)
+                heapq.heappush(self.open_nodes, distance << NODE_BITS | node)
+        for node, distance, corridor, is_first_side in graph.attachments(goal_index):
+            if node not in self.goal_attachments or distance < self.goal_attachments[node][0]:
+                self.goal_attachments[node] = (distance, corridor, is_first_side)
+        if start_index == goal_index:
+            self.best_distance, self.best_node = 0, -1
+        elif graph.node_of_block[start_index] < 0 and \
+                graph.corridor_of_block[start_index] == graph.corridor_of_block[goal_index]:
+            self.best_distance = abs(graph.position_in_corridor[start_index] - graph.position_in_corridor[goal_index])
+            self.best_node = -1
+
+    def search_step(self):
+        """Settles one node. Returns True when the shortest path has been found."""
+        open_nodes = self.open_nodes
+        if not open_nodes or open_nodes[0] >> NODE_BITS >= self.best_distance:
+            self.path_indices = self.build_path()
+            return True
+        key = heapq.heappop(open_nodes)
+        distance, node = key >> NODE_BITS, key & NODE_MASK
+        if distance > self.distances[node]:
+            return False  # A stale entry, the node has already been settled with a shorter distance
+        if self.visualize and self.grid is not None:
+            self.grid[self.graph.node_blocks[node]].visited = True
+        if node in self.goal_attachments and distance + self.goal_attachments[node][0] < self.best_distance:
+            self.best_distance = distance + self.goal_attachments[node][0]
+            self.best_node = node
+
+        graph, distances = self.graph, self.distances
+        for edge in range(graph.node_offsets[node], graph.node_offsets[node + 1]):
+            target = graph.edge_targets[edge]
+            target_distance = distance + graph.edge_weights[edge]
+            if target_distance < distances[target]:
+                distances[target] = target_distance
+                self.predecessor_edges[target] = edge
+                heapq.heappush(open_nodes, target_distance << NODE_BITS | target)
+        return False
+
+    def search(self):
+        """Settles nodes in a tight loop until the shortest path has been found. Returns the number of steps."""
+        if self.graph.is_tree:
+            return self.search_tree()
+        graph = self.graph
+        node_offsets, edge_targets, edge_weights = graph.node_offsets, graph.edge_targets, graph.edge_weights
+        distances, predecessor_edges = self.distances, self.predecessor_edges
+        goal_attachments = self.goal_attachments
+        open_nodes = self.open_nodes
+        heappop, heappush = heapq.heappop, heapq.heappush
+        best_distance, best_node = self.best_distance, self.best_node
+        steps = 1
+        while open_nodes and open_nodes[0] >> NODE_BITS < best_distance:
+            key = heappop(open_nodes)
+            steps += 1
+            distance, node = key >> NODE_BITS, key & NODE_MASK
+            if distance > distances[node]:
+                continue
+            if node in goal_attachments and distance + goal_attachments[node][0] < best_distance:
+                best_distance, best_node = distance + goal_attachments[node][0], node
+            for edge in range(node_offsets[node], node_offsets[node + 1]):
+                target = edge_targets[edge]
+                target_distance = distance + edge_weights[edge]
+                if target_distance < distances[target]:
+                    distances[target] = target_distance
+                    predecessor_edges[target] = edge
+                    heappush(open_nodes, target_distance << NODE_BITS | target)
+        self.best_distance, self.best_node = best_distance, best_node
+        self.path_indices = self.build_path()
+        return steps
+
+    def search_tree(self):
+        """Used instead of Dijkstra's algorithm if the maze is perfect, i.e. its graph is a tree.
+        There is only one path between two blocks then, so open nodes are taken in any order without a heap
+        and the search stops at the first node the goal block can be reached from. Returns the number of steps."""
+        graph = self.graph
+        node_offsets, edge_targets = graph.node_offsets, graph.edge_targets
+        predecessor_edges = self.predecessor_edges
+        goal_attachments = self.goal_attachments
+        first_goal_node, last_goal_node = (list(goal_attachments) * 2)[:2]
+        open_nodes = [key & NODE_MASK for key in self.open_nodes]
+        self.open_nodes = []
+        pop, push = open_nodes.pop, open_nodes.append
+        steps = 1
+        while self.best_node is None and open_nodes:
+            node = pop()
+            steps += 1
+            if node == first_goal_node or node == last_goal_node:
+                self.best_node = node
+                break
+            for edge in range(node_offsets[node], node_offsets[node + 1]):
+                target = edge_targets[edge]
+                if predecessor_edges[target] == -1:
+                    predecessor_edges[target] = edge
+                    push(target)
+        self.path_indices = self.build_path()
+        if self.path_indices is not None:
+            self.best_distance = len(self.path_indices) - 1  # Distances aren't tracked by this search
+        return steps
+
+    def build_path(self):
+        graph = self.graph
+        if self.best_node is None:
+            return None
+        if self.best_node == -1:  # The start and goal blocks are the same block or lie in the same corridor
+            if self.start_index == self.goal_index:
+                return [self.start_index]
+            corridor = graph.corridor_of_block[self.start_index]
+            return graph.corridor_segment(corridor, graph.position_in_corridor[self.start_index],
+                                          graph.position_in_corridor[self.goal_index])
+
+        # From the goal block back to the node it is reached from
+        _, corridor, is_first_side = self.goal_attachments[self.best_node]
+        if corridor >= 0:
+            goal_position = graph.position_in_corridor[self.goal_index]
+            reversed_path = graph.corridor_segment(corridor, goal_position,
+                                                   -1 if is_first_side else graph.corridor_length(corridor))
+        else:
+            reversed_path = [self.goal_index]
+        # From that node back to the start block
+        node = self.best_node
+        while True:
+            edge = self.predecessor_edges[node]
+            if edge == START_EDGE:
+                corridor, is_forward = self.start_attachments[node]
+                if corridor >= 0:
+                    segment = graph.corridor_segment(corridor, graph.corridor_length(corridor) if is_forward else -1,
+                                                     graph.position_in_corridor[self.start_index])
+                    reversed_path.extend(segment[1:])
+                break
+            previous_node, corridor = graph.edge_sources[edge], graph.edge_corridors[edge]
+            length = graph.corridor_length(corridor)
+            # Blocks of the corridor walked backwards, without the node it ends at and including the node it starts at
+            if graph.corridor_first_nodes[corridor] == previous_node:
+                segment = graph.corridor_segment(corridor, length, -1)
+            else:
+                segment = graph.corridor_segment(corridor, -1, length)
+            reversed_path.extend(segment[1:])
+            node = previous_node
+        reversed_path.reverse()
+        return reversed_path
+
+    def iterate(self):
+        """1. Stop iterating if there are no open nodes or the closest one is not closer
+            than the best path to the goal block found so far, and build the path.
+        2. Take the closest open node and skip it if it has already been settled with a shorter distance.
+        3. If the goal block can be reached from that node, check if the path through it is the best one.
+        4. For every edge (corridor) of the node calculate the distance to the node at its other end
+            and if it is shorter than the stored one store it with the predecessor and open that node.
+        5. Continue with next iteration."""
+        is_found = self.search_step()
+        if is_found:
+            self.path = [self.grid[index] for index in self.path_indices] if self.path_indices is not None else None
+            if self.visualize and self.path is not None:
+                for block in self.path:
+                    block.revisited = True
+        return is_found
+
+    def run(self):
+        """Runs the search to completion in a tight loop without visualization. Returns the shortest path found."""
+        if not self.is_finished:
+            self.steps_taken += self.search()
+            self.path = [self.grid[index] for index in self.path_indices] if self.path_indices is not None else None
+            self.is_finished = True
+        return self.result()
+
+    def result(self):
+        """Returns the shortest path found as a list of blocks from the starting block to the goal block."""
+        return self.path
@@ -0,0 +1,151 @@
+from data_types.priority_queue import AStarOpenSet
+from grid_block.compact_grid import WALL_N, WALL_E, WALL_S, WALL_W
+from maze_solving.utils import reset_grid, get_wall_masks, create_index_array, build_shortest_path_from_indices
+from stepping import SteppingAlgorithm
+
+NORTH, EAST, SOUTH, WEST, NO_DIRECTION = range(5)
+
+
+class JumpPointSearch(SteppingAlgorithm):
+    """Used to solve a maze using Jump Point Search: A* expanding only jump points instead of every block,
+    which pays off in mazes with removed walls (braided mazes or open rooms).
+    Adapted to four directions and to walls between blocks. Paths are ordered canonically: a vertical move
+    may be followed by a horizontal one anywhere, a horizontal move by a vertical one only at a forced neighbour.
+    - A horizontal jump stops at the goal block or at a block open to the north (south) if the previous block
+        isn't, or the block north (south) of the previous block is walled off from the block north (south)
+        of the current one, as then that side can't be reached as cheaply by going vertically first.
+    - A vertical jump stops at the goal block or at a block from which a horizontal jump finds a jump point.
+    A jump point reached horizontally continues in the same direction and to its forced neighbours,
+    reached vertically it continues in the same direction and horizontally both ways.
+    Works on grid indices (no_of_columns * y_index + x_index) instead of blocks."""
+    def __init__(self, grid, start_block, goal_block):
+        self.current_block = None
+        self.path = None
+        self.grid = grid
+        self.start_block = start_block
+        self.goal_block = goal_block
+        self.no_of_columns = grid[-1].x_index + 1
+        self.walls = get_wall_masks(grid)
+        # Indexed by direction: NORTH, EAST, SOUTH, WEST
+        self.neighbour_offsets = ((WALL_N, -self.no_of_columns), (WALL_E, 1),
+                                  (WALL_S, self.no_of_columns), (WALL_W, -1))
+        self.start_index = start_block.y_index * self.no_of_columns + start_block.x_index
+        self.goal_index = goal_block.y_index * self.no_of_columns + goal_block.x_index
+        self.open_set = AStarOpenSet(len(grid))
+        h_value = abs(start_block.x_index - goal_block.x_index) + abs(start_block.y_index - goal_block.y_index)
+        self.open_set.put(self.start_index, h_value, h_value)
+        # g values, predecessors and directions are stored only for jump points.
+        # A predecessor is the jump point the block has been jumped to from, in the stored direction.
+        self.g_values = create_index_array(len(grid))
+        self.g_values[self.start_index] = 0
+        self.predecessors = create_index_array(len(grid))
+        self.predecessors[self.start_index] = self.start_index
+        self.directions = bytearray([NO_DIRECTION]) * len(grid)
+        reset_grid(self.grid)
+
+    def jump_horizontally(self, index, direction):
+        """Moves from a block east or west until a jump point is found. Returns its grid index or -1 if a wall
+        is hit first."""
+        walls, no_of_columns, goal_index = self.walls, self.no_of_columns, self.goal_index
+        wall, offset = self.neighbour_offsets[direction]
+        while not walls[index] & wall:
+            previous_index, index = index, index + offset
+            if index == goal_index:
+                return index
+            current_walls = walls[index]
+            if not current_walls & WALL_N and \
+                    (walls[previous_index] & WALL_N or walls[previous_index - no_of_columns] & wall):
+                return index
+            if not current_walls & WALL_S and \
+                    (walls[previous_index] & WALL_S or walls[previous_index + no_of_columns] & wall):
+                return index
+        return -1
+
+    def jump_vertically(self, index, direction):
+        """Moves from a block north or south until a jump point is found. Returns its grid index or -1 if a wall
+        is hit first."""
+        walls, goal_index = self.walls, self.goal_index
+        wall, offset = self.neighbour_offsets[direction]
+        while not walls[index] & wall:
+            index += offset
+            if index == goal_index or self.jump_horizontally(index, EAST) >= 0 or \
+                    self.jump_horizontally(index, WEST) >= 0:
+                return index
+        return -1
+
+    def successor_directions(self, index):
+        """Returns directions worth jumping in from a jump point given the direction it has been reached in."""
+        direction = self.directions[index]
+        if direction == NO_DIRECTION:
+            return NORTH, EAST, SOUTH, WEST
+        if direction == NORTH or direction == SOUTH:
+            return direction, EAST, WEST
+        walls, no_of_columns = self.walls, self.no_of_columns
+        wall, offset = self.neighbour_offsets[direction]
+        previous_index = index - offset
+        directions = [direction]
+        if not walls[index] & WALL_N and \
+                (walls[previous_index] & WALL_N or walls[previous_index - no_of_columns] & wall):
+            directions.append(NORTH)
+        if not walls[index] & WALL_S and \
+                (walls[previous_index] & WALL_S or walls[previous_index + no_of_columns] & wall):
+            directions.append(SOUTH)
+        return directions
+
+    def iterate(self):
+        """1. Get a jump point from the open set.
+        2. Mark the current jump point as visited.
+        3. Check if the current jump point is the goal block. Stop iterating if it is.
+        4. For every direction worth jumping in from the current jump point jump until the next jump point
+            and calculate its g value from the length of the jump. If that jump point hasn't been discovered yet
+            or g value is lower than the stored one:
+            a) Store g value, the current jump point as its predecessor and the direction of the jump.
+            b) Put it to the open set with f value calculated using Manhattan Distance.
+        5. Continue with next iteration."""
+        if self.open_set.is_empty():
+            return True  # The goal block can't be reached
+        current_index = self.open_set.get()
+        if self.visualize:
+            self.current_block = self.grid[current_index]
+            self.current_block.visited = True
+        if current_index == self.goal_index:
+            self.path = self.build_path()
+            return True
+
+        no_of_columns = self.no_of_columns
+        goal_x, goal_y = self.goal_index % no_of_columns, self.goal_index // no_of_columns
+        g_values = self.g_values
+        for direction in self.successor_directions(current_index):
+            if direction == NORTH or direction == SOUTH:
+                jump_point = self.jump_vertically(current_index, direction)
+                distance = abs(jump_point - current_index) // no_of_columns
+            else:
+                jump_point = self.jump_horizontally(current_index, direction)
+                distance = abs(jump_point - current_index)
+            if jump_point < 0:
+                continue
+            g_value = g_values[current_index] + distance
+            if g_values[jump_point] < 0 or g_value < g_values[jump_point]:
+                g_values[jump_point] = g_value
+                h_value = abs(jump_point % no_of_columns - goal_x) + abs(jump_point // no_of_columns - goal_y)
+                self.open_set.put(jump_point, g_value + h_value, h_value)
+                self.predecessors[jump_point] = current_index
+                self.directions[jump_point] = direction
+        return False
+
+    def build_path(self):
+        """Fills in predecessors of blocks jumped over on the way from the starting block to the goal block,
+        so the path can be built block by block."""
+        predecessors = self.predecessors
+        index = self.goal_index
+        while index != self.start_index:
+            jump_point = predecessors[index]
+            offset = self.neighbour_offsets[self.directions[index]][1]
+            while index != jump_point:
+                predecessors[index] = index - offset
+                index -= offset
+        return build_shortest_path_from_indices(self.grid, predecessors, self.start_index, self.goal_index)
+
+    def result(self):
+        """Returns the shortest path found as a list of blocks from the starting block to the goal block."""
+        return self.path
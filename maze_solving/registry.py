@@ -0,0 +1,31 @@
+from maze_solving.a_star import AStar
+from maze_solving.bfs import BreadthFirstSearch
+from maze_solving.bidirectional import BidirectionalBreadthFirstSearch, BidirectionalAStar
+from maze_solving.dfs import DepthFirstSearch
+from maze_solving.graph import ContractedGraphSearch
+from maze_solving.jump_point_search import JumpPointSearch
+
+# Maps names of solving algorithms to classes taking (grid, start_block, goal_block)
+# and exposing iterate(), step() and run().
+SOLVING_ALGORITHMS = {
+    "dfs": DepthFirstSearch,
+    "bfs": BreadthFirstSearch,
+    "a_star": AStar,
+    "bidirectional_bfs": BidirectionalBreadthFirstSearch,
+    "bidirectional_a_star": BidirectionalAStar,
+    "jps": JumpPointSearch,
+    "contracted": ContractedGraphSearch,
+}
+
+
+def register_solving_algorithm(name, algorithm_class):
+    """Makes a solving algorithm available under the given name, e.g. in the command line interface."""
+    SOLVING_ALGORITHMS[name] = algorithm_class
+
+
+def get_solving_algorithm(name):
+    try:
+        return SOLVING_ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"Unknown solving algorithm {name!r}, "
+                         f"choose one of: {', '.join(sorted(SOLVING_ALGORITHMS))}") from None
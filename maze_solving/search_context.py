@@ -0,0 +1,106 @@
+from array import array
+
+from data_types.priority_queue import AStarOpenSet
+from grid_block.compact_grid import CompactGrid, VISITED, REVISITED
+from maze_solving.utils import reset_grid, get_wall_masks, create_index_array, mark_path
+
+KEEP_OTHER_FLAGS = 0xFF & ~(VISITED | REVISITED)
+MAX_STAMPED_VALUE = 2 ** 63 - 1
+
+
+class SearchContext:
+    """State of solving algorithms reused by many searches on the same maze, so a search costs time
+    proportional to the blocks it explores instead of the size of the maze.
+    - Predecessors are stamped with the epoch of the search that stored them: a search starting at epoch e
+        gets base = e * size and stores base + grid index of the predecessor, so values lower than base
+        are left by earlier searches and mean not discovered yet. Starting a search moves to the next epoch,
+        which invalidates all of them at once without clearing anything, and checking if a block
+        has been discovered costs the same single comparison as checking for -1.
+    - Other arrays indexed by grid index (g values) are valid only for blocks discovered in the current epoch.
+    - Grid indices of blocks marked as visited or revisited are recorded, and only those are cleared
+        when the next search starts, instead of resetting the whole grid.
+    Creating a context still resets the whole grid once, as blocks marked by a generator or by searches using
+    other contexts aren't recorded anywhere. So a solver created without a context (e.g. a single solve in the game
+    or the command line interface) pays that pass as before, only searches reusing a context, e.g. through
+    SolverPool, avoid it. For a CompactGrid the pass is done in C.
+    Walls of a list of Block objects are converted once too, so a new context is needed after changing them."""
+    def __init__(self, grid):
+        self.grid = grid
+        self.size = len(grid)
+        self.no_of_columns = grid[-1].x_index + 1
+        self.epoch = 0
+        self.base = 0
+        # Created only when first needed, as not every algorithm uses all of them.
+        self._walls = self._predecessors = self._g_values = self._open_set = None
+        self.marked_indices = []
+        reset_grid(grid)
+
+    @property
+    def walls(self):
+        if self._walls is None:
+            self._walls = get_wall_masks(self.grid)
+        return self._walls
+
+    @property
+    def predecessors(self):
+        """Stamped predecessors, see the class docstring."""
+        if self._predecessors is None:
+            self._predecessors = array("q", [0]) * self.size
+        return self._predecessors
+
+    @property
+    def g_values(self):
+        if self._g_values is None:
+            self._g_values = create_index_array(self.size)
+        return self._g_values
+
+    @property
+    def open_set(self):
+        if self._open_set is None:
+            self._open_set = AStarOpenSet(self.size)
+        return self._open_set
+
+    def begin(self):
+        """Starts a new search: clears marks left by the previous one and moves to a new epoch.
+        Returns the base of stamped predecessors of the new epoch."""
+        self.clear_marks()
+        if self._open_set is not None:
+            self._open_set.clear()
+        if (self.epoch + 2) * self.size > MAX_STAMPED_VALUE:  # Practically never, but stamps must not overflow
+            self._predecessors = None
+            self.epoch = 0
+        self.epoch += 1
+        self.base = self.epoch * self.size
+        return self.base
+
+    def clear_marks(self):
+        grid = self.grid
+        if isinstance(grid, CompactGrid):
+            state = grid.state
+            for index in self.marked_indices:
+                state[index] &= KEEP_OTHER_FLAGS
+                grid.mark_changed(index)
+        else:
+            for index in self.marked_indices:
+                grid[index].reset_visited_revisited()
+        self.marked_indices.clear()
+
+    def mark_visited(self, index):
+        """Marks a block as visited. Returns the block."""
+        block = self.grid[index]
+        block.visited = True
+        self.marked_indices.append(index)
+        return block
+
+    def build_shortest_path(self, start_index, goal_index):
+        """Builds the shortest path from stamped predecessors of the current epoch marking it as revisited.
+        Returns the path as a list of blocks from the starting block to the goal block."""
+        predecessors, base = self.predecessors, self.base
+        path_indices = [goal_index]
+        current_index = goal_index
+        while current_index != start_index:
+            current_index = predecessors[current_index] - base
+            path_indices.append(current_index)
+        path_indices.reverse()
+        self.marked_indices.extend(path_indices)
+        return mark_path(self.grid, path_indices)
@@ -0,0 +1,50 @@
+from maze_solving.a_star import AStar
+from maze_solving.bfs import BreadthFirstSearch
+from maze_solving.dfs import DepthFirstSearch
+from maze_solving.search_context import SearchContext
+
+# Solving algorithms taking a SearchContext, which can be reused by a solver pool.
+POOLED_SOLVING_ALGORITHMS = {
+    "dfs": DepthFirstSearch,
+    "bfs": BreadthFirstSearch,
+    "a_star": AStar,
+}
+
+
+class SolverPool:
+    """Answers many queries on the same maze, each costing time proportional to the blocks it explores.
+    Holds search contexts (see SearchContext) of finished searches and hands them out to new ones,
+    so arrays of the size of the maze are allocated and the grid is reset only when a new context is needed,
+    i.e. once for queries solved one after another.
+    Blocks marked by a solver stay marked until its context is used again, so a solver kept alive
+    while other queries are solved still has its visited blocks and path marked."""
+    def __init__(self, grid):
+        self.grid = grid
+        self.idle_contexts = []
+
+    @staticmethod
+    def get_algorithm(name):
+        try:
+            return POOLED_SOLVING_ALGORITHMS[name]
+        except KeyError:
+            raise ValueError(f"Unknown pooled solving algorithm {name!r}, "
+                             f"choose one of: {', '.join(sorted(POOLED_SOLVING_ALGORITHMS))}") from None
+
+    def create_solver(self, start_block, goal_block, algorithm="bfs"):
+        """Returns a solver using a context taken from the pool, which can be stepped like any other solver.
+        The context should be given back with release(solver) once its result is no longer needed."""
+        algorithm_class = self.get_algorithm(algorithm)
+        context = self.idle_contexts.pop() if self.idle_contexts else SearchContext(self.grid)
+        return algorithm_class(self.grid, start_block, goal_block, context=context)
+
+    def release(self, solver):
+        self.idle_contexts.append(solver.context)
+
+    def solve(self, start_block, goal_block, algorithm="bfs"):
+        """Runs a search to completion and gives its context back to the pool.
+        Returns the path found as a list of blocks from the starting block to the goal block."""
+        solver = self.create_solver(start_block, goal_block, algorithm)
+        try:
+            return solver.run()
+        finally:
+            self.release(solver)
@@ -0,0 +1,132 @@
+from collections import OrderedDict, deque, namedtuple
+
+from grid_block.compact_grid import WALL_N, WALL_E, WALL_S, WALL_W
+from maze_solving.utils import get_wall_masks, create_index_array
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "max_size", "size"])
+
+
+class MazeTreeIndex:
+    """Answers many distance and path queries on the same perfect maze, e.g. one generated with
+    RandomizedDepthFirstSearch, where the path between any two blocks is unique.
+    The maze is preprocessed once into a tree rooted at root_index: parent and depth of every block
+    and binary lifting tables (ancestors[k][index] is the 2^k-th ancestor of a block) to find
+    the lowest common ancestor (LCA) of two blocks in O(log n).
+    Distances are answered in O(log n) and paths in O(path length). Up to cache_size paths are kept
+    in a least recently used (LRU) cache, its statistics are returned by cache_info().
+    All blocks are given and returned as grid indices (no_of_columns * y_index + x_index)."""
+    def __init__(self, grid, root_index=0, cache_size=128):
+        self.grid = grid
+        self.no_of_columns = grid[-1].x_index + 1
+        self.size = len(grid)
+        self.root_index = root_index
+        self.parents, self.depths = self.build_tree(get_wall_masks(grid))
+        self.ancestors = self.build_ancestors()
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    def build_tree(self, walls):
+        """Finds the parent and the depth of every block by Breadth First Search from the root.
+        Raises ValueError if the maze isn't perfect, i.e. it has loops or blocks that can't be reached."""
+        no_of_columns = self.no_of_columns
+        parents = create_index_array(self.size)
+        depths = create_index_array(self.size)
+        parents[self.root_index], depths[self.root_index] = self.root_index, 0
+        queue = deque([self.root_index])
+        no_of_reached, no_of_openings = 1, 0
+        neighbour_offsets = ((WALL_N, -no_of_columns), (WALL_E, 1), (WALL_S, no_of_columns), (WALL_W, -1))
+        while queue:
+            current_index = queue.popleft()
+            wall_mask = walls[current_index]
+            for wall, offset in neighbour_offsets:
+                if wall_mask & wall:
+                    continue
+                no_of_openings += 1
+                neighbour_index = current_index + offset
+                if parents[neighbour_index] < 0:
+                    parents[neighbour_index] = current_index
+                    depths[neighbour_index] = depths[current_index] + 1
+                    no_of_reached += 1
+                    queue.append(neighbour_index)
+        # Every opening between two blocks is counted from both sides
+        if no_of_reached != self.size or no_of_openings != 2 * (self.size - 1):
+            raise ValueError("MazeTreeIndex requires a perfect maze: "
+                             "every block reachable and exactly one path between any two blocks")
+        return parents, depths
+
+    def build_ancestors(self):
+        """Builds binary lifting tables, the ancestor of the root is the root itself."""
+        ancestors = [self.parents]
+        for _ in range(max(max(self.depths), 1).bit_length() - 1):
+            previous = ancestors[-1]
+            ancestors.append(create_index_array(0))
+            ancestors[-1].extend([previous[ancestor] for ancestor in previous])
+        return ancestors
+
+    def ancestor(self, index, distance):
+        """Returns the ancestor of a block distance levels above it (the root if it is not that deep)."""
+        level = 0
+        while distance and level < len(self.ancestors):
+            if distance & 1:
+                index = self.ancestors[level][index]
+            distance >>= 1
+            level += 1
+        return self.root_index if distance else index
+
+    def lowest_common_ancestor(self, index, other_index):
+        depths = self.depths
+        if depths[index] < depths[other_index]:
+            index, other_index = other_index, index
+        index = self.ancestor(index, depths[index] - depths[other_index])
+        if index == other_index:
+            return index
+        for ancestors in reversed(self.ancestors):
+            if ancestors[index] != ancestors[other_index]:
+                index, other_index = ancestors[index], ancestors[other_index]
+        return self.parents[index]
+
+    def distance(self, start_index, goal_index):
+        """Returns the number of steps between two blocks."""
+        ancestor = self.lowest_common_ancestor(start_index, goal_index)
+        return self.depths[start_index] + self.depths[goal_index] - 2 * self.depths[ancestor]
+
+    def path(self, start_index, goal_index):
+        """Returns the path between two blocks as a tuple of grid indices from start_index to goal_index."""
+        key = (start_index, goal_index)
+        path = self.cache.get(key)
+        if path is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return path
+        self.misses += 1
+        path = self.build_path(start_index, goal_index)
+        if self.cache_size > 0:
+            self.cache[key] = path
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return path
+
+    def build_path(self, start_index, goal_index):
+        parents, depths = self.parents, self.depths
+        ancestor_depth = depths[self.lowest_common_ancestor(start_index, goal_index)]
+        path = [start_index]
+        while depths[path[-1]] > ancestor_depth:
+            path.append(parents[path[-1]])
+        reversed_path = [goal_index]
+        while depths[reversed_path[-1]] > ancestor_depth:
+            reversed_path.append(parents[reversed_path[-1]])
+        reversed_path.pop()  # The lowest common ancestor is already at the end of path
+        path.extend(reversed(reversed_path))
+        return tuple(path)
+
+    def path_blocks(self, start_index, goal_index):
+        """Returns the path between two blocks as a list of blocks, like solving algorithms do."""
+        return [self.grid[index] for index in self.path(start_index, goal_index)]
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.cache_size, len(self.cache))
+
+    def clear_cache(self):
+        self.cache.clear()
+        self.hits = self.misses = 0
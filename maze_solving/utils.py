@@ -1,13 +1,23 @@
+from array import array
+
+from grid_block.compact_grid import CompactGrid, WALL_N, WALL_E, WALL_S, WALL_W, REVISITED
+
+
 def reset_grid(grid):
     """Resets the grid to allow solving process visualization."""
+    if isinstance(grid, CompactGrid):
+        grid.reset_visited_revisited()
+        return
     for block in grid:
         block.reset_visited_revisited()
 
 
 def build_shortest_path(grid, predecessors, start_block, goal_block):
     """Used to build the shortest path found by an algorithm.
-    Uses revisited attribute of a block to show the shortest path."""
+    Uses revisited attribute of a block to show the shortest path.
+    Returns the path as a list of blocks from the starting block to the goal block."""
     goal_block.revisited = True
+    path = [goal_block]
     no_of_columns = grid[-1].x_index + 1
     current_block_indices = (goal_block.x_index, goal_block.y_index)
 
@@ -15,4 +25,57 @@ def build_shortest_path(grid, predecessors, start_block, goal_block):
         current_block_indices = predecessors[current_block_indices]
         grid_index = current_block_indices[1] * no_of_columns + current_block_indices[0]
         grid[grid_index].revisited = True
+        path.append(grid[grid_index])
     start_block.revisited = True
+    path.reverse()
+    return path
+
+
+def get_wall_masks(grid):
+    """Returns 4-bit wall masks (see grid_block.compact_grid) of every block indexed by grid index.
+    A CompactGrid shares its buffer, a list of Block objects is converted once."""
+    if isinstance(grid, CompactGrid):
+        return grid.walls
+    return bytearray(WALL_N * block.wall.n | WALL_E * block.wall.e | WALL_S * block.wall.s | WALL_W * block.wall.w
+                     for block in grid)
+
+
+def create_index_array(size, initial_value=-1):
+    """Creates a flat preallocated array of grid indices, e.g. to store predecessors."""
+    typecode = "i" if size < 2 ** 31 else "q"
+    return array(typecode, [initial_value]) * size
+
+
+def build_path_indices(predecessors, start_index, goal_index):
+    """Returns grid indices of the path from the starting block to the goal block.
+    predecessors is indexed by grid index and stores grid index of the block that discovered that block."""
+    path_indices = [goal_index]
+    current_index = goal_index
+    while current_index != start_index:
+        current_index = predecessors[current_index]
+        path_indices.append(current_index)
+    path_indices.reverse()
+    return path_indices
+
+
+def build_shortest_path_from_indices(grid, predecessors, start_index, goal_index):
+    """Used to build the shortest path found by an algorithm working on grid indices.
+    predecessors is indexed by grid index and stores grid index of the block that discovered that block.
+    Uses revisited attribute of a block to show the shortest path.
+    Returns the path as a list of blocks from the starting block to the goal block."""
+    return mark_path(grid, build_path_indices(predecessors, start_index, goal_index))
+
+
+def mark_path(grid, path_indices):
+    """Uses revisited attribute of blocks given by grid indices to show the shortest path.
+    Returns the path as a list of blocks."""
+    path = [grid[index] for index in path_indices]
+    if isinstance(grid, CompactGrid):
+        state = grid.state
+        for index in path_indices:
+            state[index] |= REVISITED
+            grid.mark_changed(index)
+    else:
+        for block in path:
+            block.revisited = True
+    return path
@@ -0,0 +1,98 @@
+import mmap
+
+from grid_block.compact_grid import CompactGrid
+from maze_storage.maze_file import HEADER, FLAG_HAS_SOLUTIONS, MazeFileError, MazeHeader, decode_solutions, \
+    unpack_walls
+
+
+class PackedWalls:
+    """A read-only sequence of 4-bit wall masks packed two per byte in a buffer (see maze_storage.maze_file),
+    indexed by grid index like CompactGrid.walls. Wall masks are unpacked on access, nothing is copied."""
+    __slots__ = ("data", "size")
+
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            if step != 1:
+                return bytearray(self[i] for i in range(start, stop, step))
+            if start >= stop:
+                return bytearray()
+            walls = unpack_walls(bytes(self.data[start >> 1:(stop + 1) >> 1]))
+            return walls[start & 1:(start & 1) + stop - start]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("grid index out of range")
+        byte = self.data[index >> 1]
+        return byte >> 4 if index & 1 else byte & 0x0f
+
+
+class MappedGrid(CompactGrid):
+    """A CompactGrid whose walls are read in place from a memory-mapped maze file, so even a multi-GB maze
+    opens instantly and the solving algorithms read walls straight from the page cache.
+    Walls are read-only. Visited, revisited and part of path flags are allocated the first time they are used."""
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file can't be mapped
+            self.file.close()
+            raise MazeFileError("File is too short to be a maze file") from None
+        self.buffer = memoryview(self.mmap)
+        try:
+            self.header = MazeHeader.from_bytes(self.mmap[:HEADER.size])  # A copy, so no view outlives close()
+            self.no_of_columns = self.header.no_of_columns
+            self.no_of_rows = self.header.no_of_rows
+            self.walls_end = HEADER.size + self.header.walls_size
+            if len(self.buffer) < self.walls_end:
+                raise MazeFileError("Maze file is truncated")
+            self.walls = PackedWalls(self.buffer[HEADER.size:self.walls_end], self.no_of_columns * self.no_of_rows)
+        except BaseException:
+            self.close()
+            raise
+        self._state = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"MappedGrid({self.file.name!r}, {self.no_of_columns}, {self.no_of_rows})"
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = bytearray(len(self.walls))
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        self._state = value
+
+    @property
+    def solutions(self):
+        """Stored solutions as lists of grid indices, empty if there are none."""
+        if not self.header.flags & FLAG_HAS_SOLUTIONS:
+            return []
+        return decode_solutions(self.buffer, self.walls_end, self.no_of_columns)
+
+    def reset_visited_revisited(self):
+        if self._state is not None:
+            super().reset_visited_revisited()
+
+    def close(self):
+        if hasattr(self, "walls"):
+            self.walls.data.release()
+        self.buffer.release()
+        self.mmap.close()
+        self.file.close()
+
@@ -0,0 +1,314 @@
+"""Binary maze files.
+
+Layout (all integers little-endian):
+    magic             4 bytes   b"MAZE"
+    version           uint16    1
+    flags             uint16    bit 0 - the seed is stored, bit 1 - solutions are stored
+    no_of_columns     uint64
+    no_of_rows        uint64
+    seed              int64     0 if it isn't stored
+    generator         16 bytes  ASCII name of the generating algorithm, padded with zero bytes
+    walls             4-bit wall mask (see grid_block.compact_grid) of every block in grid index order,
+                      two blocks per byte, the block with the even grid index in the low nibble.
+                      The last byte is padded with a zero nibble if the number of blocks is odd.
+    solutions         only if flag bit 1 is set:
+        count             uint32    number of stored solution paths
+        for every path:
+            start         uint64    grid index of the first block of the path
+            moves         uint64    number of moves (blocks in the path - 1)
+            directions    2 bits per move (0 - N, 1 - E, 2 - S, 3 - W), four moves per byte,
+                          the first move in the lowest bits, the last byte padded with zero bits
+
+Rows are written and read one at a time, so a maze can be streamed from a generator to a file
+and back without keeping more than one row in memory.
+Walls can also be read in place from a memory-mapped file with MappedGrid, see maze_storage.mapped_grid.
+"""
+import io
+import random
+import struct
+
+from grid_block.compact_grid import CompactGrid
+from maze_building.build_eller import generate_rows
+from maze_solving.utils import get_wall_masks
+
+MAGIC = b"MAZE"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQq16s")
+SOLUTION_COUNT = struct.Struct("<I")
+SOLUTION_HEADER = struct.Struct("<QQ")
+FLAG_HAS_SEED = 1
+FLAG_HAS_SOLUTIONS = 2
+
+_LOW_NIBBLES = bytes(value & 0x0f for value in range(256))
+_HIGH_NIBBLES = bytes(value >> 4 for value in range(256))
+_SHIFT_TO_HIGH_NIBBLE = bytes((value << 4) & 0xff for value in range(256))
+
+
+class MazeFileError(ValueError):
+    """Raised when a file is not a valid maze file."""
+
+
+def pack_walls(walls):
+    """Packs wall masks (one per byte) two per byte. walls must have an even length."""
+    if not walls:
+        return b""
+    low = int.from_bytes(walls[0::2], "little")
+    high = int.from_bytes(walls[1::2].translate(_SHIFT_TO_HIGH_NIBBLE), "little")
+    return (low | high).to_bytes(len(walls) // 2, "little")
+
+
+def unpack_walls(packed):
+    """Unpacks packed wall masks to one wall mask per byte."""
+    walls = bytearray(2 * len(packed))
+    walls[0::2] = packed.translate(_LOW_NIBBLES)
+    walls[1::2] = packed.translate(_HIGH_NIBBLES)
+    return walls
+
+
+def encode_solution(path_indices, no_of_columns):
+    """Encodes a path given as grid indices of adjacent blocks as a stored solution."""
+    offsets = {-no_of_columns: 0, 1: 1, no_of_columns: 2, -1: 3}
+    moves = len(path_indices) - 1
+    directions = bytearray((moves + 3) // 4)
+    for move in range(moves):
+        try:
+            direction = offsets[path_indices[move + 1] - path_indices[move]]
+        except KeyError:
+            raise ValueError(f"Blocks {path_indices[move]} and {path_indices[move + 1]} are not adjacent") from None
+        directions[move >> 2] |= direction << ((move & 3) << 1)
+    return SOLUTION_HEADER.pack(path_indices[0], moves) + directions
+
+
+def decode_solution(data, offset, no_of_columns):
+    """Decodes a stored solution starting at offset of data. Returns grid indices of the path and the offset
+    right after the solution."""
+    start, moves = SOLUTION_HEADER.unpack_from(data, offset)
+    offset += SOLUTION_HEADER.size
+    offsets = (-no_of_columns, 1, no_of_columns, -1)
+    path_indices = [start]
+    index = start
+    for move in range(moves):
+        index += offsets[(data[offset + (move >> 2)] >> ((move & 3) << 1)) & 3]
+        path_indices.append(index)
+    return path_indices, offset + (moves + 3) // 4
+
+
+def decode_solutions(data, offset, no_of_columns):
+    """Decodes the solutions section starting at offset of data. Returns a list of paths given as grid indices."""
+    (count,) = SOLUTION_COUNT.unpack_from(data, offset)
+    offset += SOLUTION_COUNT.size
+    solutions = []
+    for _ in range(count):
+        path_indices, offset = decode_solution(data, offset, no_of_columns)
+        solutions.append(path_indices)
+    return solutions
+
+
+class MazeHeader:
+    def __init__(self, no_of_columns, no_of_rows, seed=None, generator="", flags=0):
+        self.no_of_columns = no_of_columns
+        self.no_of_rows = no_of_rows
+        self.seed = seed
+        self.generator = generator
+        self.flags = flags | (FLAG_HAS_SEED if seed is not None else 0)
+
+    def __repr__(self):
+        return (f"MazeHeader({self.no_of_columns}, {self.no_of_rows}, seed={self.seed}, "
+                f"generator={self.generator!r})")
+
+    @property
+    def walls_size(self):
+        """Number of bytes taken by packed walls."""
+        return (self.no_of_columns * self.no_of_rows + 1) // 2
+
+    def to_bytes(self):
+        generator = self.generator.encode("ascii")
+        if len(generator) > 16:
+            raise ValueError(f"Name of the generating algorithm is longer than 16 characters: {self.generator!r}")
+        return HEADER.pack(MAGIC, VERSION, self.flags, self.no_of_columns, self.no_of_rows,
+                           self.seed if self.seed is not None else 0, generator)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise MazeFileError("File is too short to be a maze file")
+        magic, version, flags, no_of_columns, no_of_rows, seed, generator = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise MazeFileError("File is not a maze file")
+        if version != VERSION:
+            raise MazeFileError(f"Unsupported maze file version {version}")
+        return cls(no_of_columns, no_of_rows, seed if flags & FLAG_HAS_SEED else None,
+                   generator.rstrip(b"\0").decode("ascii"), flags)
+
+
+class MazeWriter:
+    """Writes a maze to a binary file row by row.
+    If no_of_rows is None the number of rows written is stored when the writer is closed,
+    which requires a seekable file."""
+    def __init__(self, file, no_of_columns, no_of_rows=None, seed=None, generator=""):
+        self.file = file
+        self.header = MazeHeader(no_of_columns, no_of_rows or 0, seed, generator)
+        self.expected_rows = no_of_rows
+        self.header_position = file.tell() if no_of_rows is None or file.seekable() else None
+        self.rows_written = 0
+        self.pending_wall = None  # Wall mask waiting for its pair if the number of written blocks is odd
+        self.solutions = []
+        file.write(self.header.to_bytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # Writing failed, drop what is buffered without checking the number of rows,
+            # so the original exception isn't replaced by a row count error.
+            self.pending_wall = None
+            self.solutions = []
+            return
+        self.close()
+
+    def write_row(self, walls):
+        """Writes wall masks (one per byte) of a row."""
+        if len(walls) != self.header.no_of_columns:
+            raise ValueError(f"Row has {len(walls)} blocks instead of {self.header.no_of_columns}")
+        if self.pending_wall is not None:
+            walls = bytes([self.pending_wall]) + walls
+            self.pending_wall = None
+        if len(walls) % 2:
+            self.pending_wall = walls[-1]
+            walls = walls[:-1]
+        self.file.write(pack_walls(walls))
+        self.rows_written += 1
+
+    def write_rows(self, rows):
+        for walls in rows:
+            self.write_row(walls)
+
+    def add_solution(self, path_indices):
+        """Adds a solution path given as grid indices, written after the walls when the writer is closed.
+        Storing solutions requires a seekable file, as the header is updated when the writer is closed."""
+        if self.header_position is None:
+            raise ValueError("Storing solutions requires a seekable file")
+        self.solutions.append(encode_solution(path_indices, self.header.no_of_columns))
+
+    def close(self):
+        if self.pending_wall is not None:
+            self.file.write(bytes([self.pending_wall]))
+            self.pending_wall = None
+        if self.expected_rows is not None and self.rows_written != self.expected_rows:
+            raise ValueError(f"{self.rows_written} rows were written instead of {self.expected_rows}")
+        if self.solutions:
+            self.header.flags |= FLAG_HAS_SOLUTIONS
+            self.file.write(SOLUTION_COUNT.pack(len(self.solutions)))
+            for solution in self.solutions:
+                self.file.write(solution)
+            self.solutions = []
+        if self.expected_rows is None or self.header.flags & FLAG_HAS_SOLUTIONS:
+            end_position = self.file.tell()
+            self.header.no_of_rows = self.rows_written
+            self.file.seek(self.header_position)
+            self.file.write(self.header.to_bytes())
+            self.file.seek(end_position)
+
+
+class MazeReader:
+    """Reads a maze from a binary file row by row."""
+    def __init__(self, file):
+        self.file = file
+        self.header = MazeHeader.from_bytes(file.read(HEADER.size))
+        self.walls_position = file.tell()
+
+    def rows(self):
+        """Yields wall masks (one per byte) of every row. Only one row is kept in memory."""
+        no_of_columns = self.header.no_of_columns
+        self.file.seek(self.walls_position)
+        pending_wall = None
+        for _ in range(self.header.no_of_rows):
+            # Number of blocks still to be unpacked from the file for this row
+            needed = no_of_columns - (pending_wall is not None)
+            packed = self.file.read((needed + 1) // 2)
+            if len(packed) != (needed + 1) // 2:
+                raise MazeFileError("Maze file is truncated")
+            walls = unpack_walls(packed)
+            if pending_wall is not None:
+                walls.insert(0, pending_wall)
+                pending_wall = None
+            if len(walls) > no_of_columns:
+                pending_wall = walls.pop()
+            yield walls
+
+    def read_solutions(self):
+        """Reads stored solutions. Returns a list of paths given as grid indices, empty if there are none."""
+        if not self.header.flags & FLAG_HAS_SOLUTIONS:
+            return []
+        self.file.seek(self.walls_position + self.header.walls_size)
+        return decode_solutions(self.file.read(), 0, self.header.no_of_columns)
+
+    def read_grid(self):
+        """Reads the whole maze into a CompactGrid, which can be solved by algorithms in maze_solving."""
+        no_of_columns = self.header.no_of_columns
+        grid = CompactGrid(no_of_columns, self.header.no_of_rows)
+        for y_index, walls in enumerate(self.rows()):
+            grid.walls[y_index * no_of_columns:(y_index + 1) * no_of_columns] = walls
+        return grid
+
+
+def write_grid_to_file(file, grid, seed=None, generator="", solutions=()):
+    """Writes a whole grid (a CompactGrid or a list of Block objects) to an open binary file.
+    solutions are paths given as lists of blocks, e.g. returned by run() of a solving algorithm."""
+    no_of_columns = grid[-1].x_index + 1
+    no_of_rows = grid[-1].y_index + 1
+    walls = get_wall_masks(grid)
+    with MazeWriter(file, no_of_columns, no_of_rows, seed, generator) as writer:
+        for y_index in range(no_of_rows):
+            writer.write_row(walls[y_index * no_of_columns:(y_index + 1) * no_of_columns])
+        for solution in solutions:
+            writer.add_solution([block.y_index * no_of_columns + block.x_index for block in solution])
+
+
+def write_grid(path, grid, seed=None, generator="", solutions=()):
+    """Writes a whole grid (a CompactGrid or a list of Block objects) to a maze file."""
+    with open(path, "wb") as file:
+        write_grid_to_file(file, grid, seed, generator, solutions)
+
+
+def grid_to_bytes(grid, seed=None, generator="", solutions=()):
+    """Serializes a grid in the maze file format, e.g. to pass it to another process."""
+    file = io.BytesIO()
+    write_grid_to_file(file, grid, seed, generator, solutions)
+    return file.getvalue()
+
+
+def grid_from_bytes(data):
+    """Deserializes a grid serialized by grid_to_bytes() into a CompactGrid.
+    Returns the grid, the header and stored solutions (lists of grid indices)."""
+    header = MazeHeader.from_bytes(data)
+    walls_end = HEADER.size + header.walls_size
+    if len(data) < walls_end:
+        raise MazeFileError("Maze file is truncated")
+    size = header.no_of_columns * header.no_of_rows
+    grid = CompactGrid(header.no_of_columns, header.no_of_rows, walls=unpack_walls(data[HEADER.size:walls_end])[:size])
+    solutions = decode_solutions(data, walls_end, header.no_of_columns) if header.flags & FLAG_HAS_SOLUTIONS else []
+    return grid, header, solutions
+
+
+def read_grid(path):
+    """Reads a maze file into a CompactGrid. Returns the grid and the header of the file."""
+    with open(path, "rb") as file:
+        reader = MazeReader(file)
+        return reader.read_grid(), reader.header
+
+
+def write_rows(path, rows, no_of_columns, seed=None, generator=""):
+    """Writes rows (an iterable of wall masks, one per byte) to a maze file as they are produced.
+    The number of rows is stored once rows are exhausted."""
+    with open(path, "wb") as file, MazeWriter(file, no_of_columns, None, seed, generator) as writer:
+        writer.write_rows(rows)
+
+
+def stream_maze_to_file(path, no_of_columns, no_of_rows, seed=None):
+    """Generates a maze with Eller's algorithm and writes it to a file row by row.
+    Peak memory is proportional to no_of_columns however many rows there are."""
+    rows = generate_rows(no_of_columns, no_of_rows, random.Random(seed))
+    with open(path, "wb") as file, MazeWriter(file, no_of_columns, no_of_rows, seed, "eller") as writer:
+        writer.write_rows(rows)
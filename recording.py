@@ -0,0 +1,260 @@
+"""Recording of generating and solving runs on a CompactGrid and their playback without rerunning the algorithm.
+
+Every step of a run is stored as a packed record of the blocks it changed, in grid index order:
+    index delta   varint (7 bits per byte, the lowest first, the high bit set on all bytes but the last),
+                  grid index minus the previous grid index of the record minus 1 (the first one minus -1)
+    change        1 byte, walls XOR (low nibble) | state XOR << 4 (high nibble), see grid_block.compact_grid
+Changes are stored as XOR of the old and the new value, so applying a record again undoes its step
+and playback can move backward as cheaply as forward.
+Keyframes (copies of walls and state) are taken every time the number of changes recorded since the last one
+reaches keyframe_interval, so seeking finds the closest keyframe with bisect in O(log n) and applies
+a bounded number of records from there.
+
+Example:
+    solver = BreadthFirstSearch(grid, grid[0], grid[-1])
+    recorder = Recorder(grid)
+    recorder.attach(solver)
+    while not solver.step(10):
+        pass
+    player = Player(recorder.recording, grid)
+    player.seek(len(player.recording) // 2)  # The grid as it was halfway through the run
+"""
+import re
+from array import array
+from bisect import bisect_right
+
+from grid_block.compact_grid import CompactGrid
+
+# Finds non-zero bytes, i.e. blocks which differ, in XOR of two buffers.
+_NON_ZERO_BYTE = re.compile(b"[^\x00]")
+
+
+def changed_indices_between(old, new):
+    """Returns grid indices at which two buffers of the same length differ. Compares them in C."""
+    difference = (int.from_bytes(old, "little") ^ int.from_bytes(new, "little")).to_bytes(len(old), "little")
+    return [match.start() for match in _NON_ZERO_BYTE.finditer(difference)]
+
+
+class Recording:
+    """Packed records of steps of a single run and keyframes, see the module docstring.
+    offsets store the position in data of the record of every step and the end of data,
+    so the record of step i (turning the grid after i steps into the grid after i + 1 steps)
+    is data[offsets[i]:offsets[i + 1]]."""
+    def __init__(self, no_of_columns, no_of_rows):
+        self.no_of_columns = no_of_columns
+        self.no_of_rows = no_of_rows
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        self.keyframe_steps = []
+        self.keyframes = []  # (walls, state) after the corresponding number of steps
+
+    def __len__(self):
+        """Returns the number of recorded steps."""
+        return len(self.offsets) - 1
+
+    def add_keyframe(self, walls, state):
+        self.keyframe_steps.append(len(self))
+        self.keyframes.append((bytes(walls), bytes(state)))
+
+    def closest_keyframe(self, step):
+        """Returns the index of the last keyframe taken at or before a step."""
+        return bisect_right(self.keyframe_steps, step) - 1
+
+
+class Recorder:
+    """Records steps of algorithms working on a CompactGrid into a Recording.
+    The grid is compared only at grid indices changed during a step, which are collected with change tracking
+    of the grid. Changes keep being collected for other consumers, e.g. GridRenderer, if the grid was already
+    tracking them. A step after which every block may have changed (e.g. after resetting the grid)
+    is found by comparing the whole grid.
+    Changes made between recorded steps, e.g. by the constructor of the next attached algorithm resetting the grid,
+    are recorded as part of the following step, so one recorder can record several algorithms in a row.
+    keyframe_interval is the number of changed blocks between keyframes, a quarter of the grid by default,
+    so keyframes take at most 8 bytes per recorded change and seeking applies at most that many changes."""
+    def __init__(self, grid, keyframe_interval=None):
+        if not isinstance(grid, CompactGrid):
+            raise TypeError("Only runs on a CompactGrid can be recorded")
+        self.grid = grid
+        self.keyframe_interval = keyframe_interval if keyframe_interval is not None else max(len(grid) // 4, 1024)
+        self.recording = Recording(grid.no_of_columns, grid.no_of_rows)
+        # The grid as it was after the last recorded step
+        self.walls = bytearray(grid.walls)
+        self.state = bytearray(grid.state)
+        self.changes_since_keyframe = 0
+        self.forwards_changes = grid.changed_indices is not None
+        if not self.forwards_changes:
+            grid.track_changes()
+        self.recording.add_keyframe(self.walls, self.state)
+        self.pending_changes = None  # Changes collected for other consumers before the current step
+        self.changes_between_steps = None  # Grid indices changed since the last step, None if any block may have
+        self.remember_handed_changes()
+
+    def attach(self, algorithm):
+        """Records every step of an algorithm working on the grid. A tight run() loop bypassing iterate()
+        is recorded as a single step. Returns the same algorithm."""
+        iterate, run = algorithm.iterate, algorithm.run
+
+        def recorded_iterate():
+            self.start_step()
+            try:
+                return iterate()
+            finally:
+                self.end_step()
+
+        def recorded_run():
+            self.start_step()
+            try:
+                return run()
+            finally:
+                self.end_step()
+
+        algorithm.iterate, algorithm.run = recorded_iterate, recorded_run
+        return algorithm
+
+    def remember_handed_changes(self):
+        """Remembers changes left on the grid after a step, to find changes made before the next one."""
+        grid = self.grid
+        self.handed_changes = (grid.changed_indices, len(grid.changed_indices), grid.is_fully_changed)
+
+    def find_changes_between_steps(self):
+        """Returns grid indices which may have changed since the last step, None if any block may have.
+        Changes only accumulate on the grid until they are taken, so nothing has changed if the same set
+        of the same size is still there."""
+        grid = self.grid
+        handed_indices, handed_size, handed_fully_changed = self.handed_changes
+        is_same_set = grid.changed_indices is handed_indices
+        if grid.is_fully_changed and not (is_same_set and handed_fully_changed):
+            return None
+        if is_same_set and len(grid.changed_indices) == handed_size:
+            return set()
+        return grid.changed_indices  # Indices taken already were compared after earlier steps
+
+    def start_step(self):
+        grid = self.grid
+        self.changes_between_steps = self.find_changes_between_steps()
+        self.pending_changes = (grid.changed_indices, grid.is_fully_changed)
+        grid.changed_indices = set()
+        grid.is_fully_changed = False
+
+    def end_step(self):
+        grid = self.grid
+        changed_indices, is_fully_changed = grid.changed_indices, grid.is_fully_changed
+        pending_indices, pending_fully_changed = self.pending_changes
+        self.pending_changes = None
+        if self.forwards_changes:
+            pending_indices |= changed_indices
+            grid.changed_indices, grid.is_fully_changed = pending_indices, pending_fully_changed or is_fully_changed
+        else:
+            grid.changed_indices, grid.is_fully_changed = set(), False
+        self.remember_handed_changes()
+        if self.changes_between_steps is None:
+            is_fully_changed = True
+        else:
+            changed_indices |= self.changes_between_steps
+        self.changes_between_steps = None
+        if is_fully_changed:
+            changed_indices = set(changed_indices_between(self.walls, grid.walls))
+            changed_indices.update(changed_indices_between(self.state, grid.state))
+        self.add_step(changed_indices)
+
+    def add_step(self, changed_indices):
+        """Appends the record of a step changing (at most) blocks at the given grid indices."""
+        walls, state = self.walls, self.state
+        grid_walls, grid_state = self.grid.walls, self.grid.state
+        data = self.recording.data
+        previous_index = -1
+        no_of_changes = 0
+        for index in sorted(changed_indices):
+            change = (walls[index] ^ grid_walls[index]) | (state[index] ^ grid_state[index]) << 4
+            if not change:
+                continue
+            delta = index - previous_index - 1
+            while delta > 0x7f:
+                data.append(delta & 0x7f | 0x80)
+                delta >>= 7
+            data.append(delta)
+            data.append(change)
+            walls[index], state[index] = grid_walls[index], grid_state[index]
+            previous_index = index
+            no_of_changes += 1
+        self.recording.offsets.append(len(data))
+        self.changes_since_keyframe += no_of_changes
+        if self.changes_since_keyframe >= self.keyframe_interval:
+            self.recording.add_keyframe(walls, state)
+            self.changes_since_keyframe = 0
+
+
+class Player:
+    """Plays a Recording back on a CompactGrid of the same size, e.g. the grid the run was recorded on.
+    Changed blocks are marked as changed on the grid, so a renderer redraws only them.
+    The grid is set to the state before the first step when the player is created."""
+    def __init__(self, recording, grid):
+        if (grid.no_of_columns, grid.no_of_rows) != (recording.no_of_columns, recording.no_of_rows):
+            raise ValueError("The grid and the recording have different sizes")
+        self.recording = recording
+        self.grid = grid
+        self.position = 0  # Number of steps applied to the grid
+        self.restore_keyframe(0)
+
+    def is_at_end(self):
+        return self.position == len(self.recording)
+
+    def restore_keyframe(self, keyframe_index):
+        walls, state = self.recording.keyframes[keyframe_index]
+        self.grid.walls[:] = walls
+        self.grid.state[:] = state
+        self.grid.mark_fully_changed()
+        self.position = self.recording.keyframe_steps[keyframe_index]
+
+    def apply_record(self, step):
+        """Applies the record of a step, which makes the step if the grid is before it and undoes it otherwise."""
+        data, offsets = self.recording.data, self.recording.offsets
+        grid = self.grid
+        walls, state = grid.walls, grid.state
+        position, end = offsets[step], offsets[step + 1]
+        index = -1
+        while position < end:
+            byte = data[position]
+            position += 1
+            delta, shift = byte & 0x7f, 7
+            while byte & 0x80:
+                byte = data[position]
+                position += 1
+                delta |= (byte & 0x7f) << shift
+                shift += 7
+            index += delta + 1
+            change = data[position]
+            position += 1
+            walls[index] ^= change & 0x0f
+            state[index] ^= change >> 4
+            grid.mark_changed(index)
+
+    def step_forward(self, n=1):
+        """Makes up to n recorded steps. Returns True if the end of the recording has been reached."""
+        end = min(self.position + n, len(self.recording))
+        for step in range(self.position, end):
+            self.apply_record(step)
+        self.position = end
+        return self.is_at_end()
+
+    def step_backward(self, n=1):
+        """Undoes up to n recorded steps. Returns True if the start of the recording has been reached."""
+        start = max(self.position - n, 0)
+        for step in range(self.position - 1, start - 1, -1):
+            self.apply_record(step)
+        self.position = start
+        return not self.position
+
+    def seek(self, step):
+        """Sets the grid to the state after a given number of steps, starting from the closest keyframe
+        unless the current position is closer."""
+        step = min(max(step, 0), len(self.recording))
+        keyframe_index = self.recording.closest_keyframe(step)
+        keyframe_step = self.recording.keyframe_steps[keyframe_index]
+        if keyframe_step <= self.position <= step:
+            self.step_forward(step - self.position)
+        elif step < self.position and self.position - step <= step - keyframe_step:
+            self.step_backward(self.position - step)
+        else:
+            self.restore_keyframe(keyframe_index)
+            self.step_forward(step - self.position)
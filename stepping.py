@@ -0,0 +1,86 @@
+import time
+
+
+class SteppingAlgorithm:
+    """Base class of maze generators and solvers.
+    A subclass implements iterate() which makes a single step and returns True when the algorithm is finished,
+    and result() which returns the generated maze or the found path.
+    visualize can be set to False to skip marking blocks as visited/revisited on every step."""
+    visualize = True
+    is_finished = False
+    steps_taken = 0
+
+    def iterate(self):
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+    def step(self, n=1):
+        """Makes up to n steps. Used by the pygame frontend to make several steps per frame.
+        Returns True if the algorithm is finished."""
+        iterate = self.iterate
+        steps = 0
+        is_finished = self.is_finished
+        while not is_finished and steps < n:
+            is_finished = iterate()
+            steps += 1
+        self.steps_taken += steps
+        self.is_finished = is_finished
+        return is_finished
+
+    def run(self):
+        """Runs the algorithm to completion in a tight loop with per-step visualization turned off.
+        Returns the generated maze or the found path."""
+        if not self.is_finished:
+            visualize = self.visualize
+            self.visualize = False
+            iterate = self.iterate
+            steps = 1
+            try:
+                while not iterate():
+                    steps += 1
+            finally:
+                self.visualize = visualize
+            self.steps_taken += steps
+            self.is_finished = True
+        return self.result()
+
+
+class FrameScheduler:
+    """Advances an algorithm, or a replay, every frame of the pygame frontend within a time budget,
+    so the frame rate doesn't depend on how long steps take or on the size of the maze.
+    Steps are made in chunks and the time is checked after every chunk. The chunk size adapts to keep chunks
+    at a small fraction of the budget, so reading the clock costs little and the budget is overrun by little.
+    Changes made by the steps are handed to the renderer by the change tracking of the grid."""
+    def __init__(self, budget_ms=8.0):
+        self.budget = budget_ms / 1000
+        self.chunk_size = 1
+        self.steps_made = 0  # Steps made in the last frame
+
+    def advance(self, step, max_steps):
+        """Calls step(n) (e.g. SteppingAlgorithm.step) until max_steps steps are made, the budget is spent
+        or step(n) returns True, which means the algorithm is finished. Returns that value."""
+        perf_counter = time.perf_counter
+        budget = self.budget
+        deadline = perf_counter() + budget
+        chunk_size = self.chunk_size
+        steps = 0
+        is_finished = False
+        while steps < max_steps:
+            n = min(chunk_size, max_steps - steps)
+            start_time = perf_counter()
+            is_finished = step(n)
+            steps += n
+            now = perf_counter()
+            # Grow only after a full chunk was measured and never beyond the steps allowed in a frame,
+            # so the first chunk after the number of steps per frame goes up stays within the budget.
+            if n == chunk_size and now - start_time < budget / 16:
+                chunk_size = min(chunk_size * 2, max_steps)
+            elif now - start_time > budget / 4 and chunk_size > 1:
+                chunk_size //= 2
+            if is_finished or now >= deadline:
+                break
+        self.chunk_size = max(1, min(chunk_size, max_steps))
+        self.steps_made = steps
+        return is_finished
@@ -0,0 +1,78 @@
+import os
+import random
+
+import pytest
+
+from grid_block.compact_grid import CompactGrid
+from maze_building.registry import GENERATING_ALGORITHMS
+from maze_solving.registry import SOLVING_ALGORITHMS
+from maze_storage.mapped_grid import MappedGrid
+from maze_storage.maze_file import HEADER, MazeFileError, grid_from_bytes, grid_to_bytes, write_grid
+
+SIZES = [(1, 1), (1, 7), (7, 1), (3, 3), (10, 6)]
+
+
+def generate_and_solve(no_of_columns, no_of_rows, seed=1):
+    """Returns a maze and two solution paths (lists of blocks) between different blocks."""
+    grid = GENERATING_ALGORITHMS["dfs"](CompactGrid(no_of_columns, no_of_rows), random.Random(seed)).run()
+    solutions = [SOLVING_ALGORITHMS["bfs"](grid, grid[0], grid[-1]).run(),
+                 SOLVING_ALGORITHMS["bfs"](grid, grid[-1], grid[len(grid) // 2]).run()]
+    return grid, solutions
+
+
+def open_file_count():
+    if not os.path.isdir("/proc/self/fd"):
+        pytest.skip("open file descriptors can't be listed on this system")
+    return len(os.listdir("/proc/self/fd"))
+
+
+def to_indices(path):
+    return [block.index for block in path]
+
+
+@pytest.mark.parametrize("no_of_columns, no_of_rows", SIZES)
+def test_mapped_grid_reads_walls_and_solutions(tmp_path, no_of_columns, no_of_rows):
+    grid, solutions = generate_and_solve(no_of_columns, no_of_rows)
+    path = str(tmp_path / "maze.maze")
+    write_grid(path, grid, seed=1, generator="dfs", solutions=solutions)
+    with MappedGrid(path) as mapped:
+        assert (mapped.no_of_columns, mapped.no_of_rows) == (no_of_columns, no_of_rows)
+        assert [mapped.walls[index] for index in range(len(mapped))] == list(grid.walls)
+        assert mapped.solutions == [to_indices(solution) for solution in solutions]
+        assert (mapped.header.seed, mapped.header.generator) == (1, "dfs")
+        solved = SOLVING_ALGORITHMS["a_star"](mapped, mapped[0], mapped[-1]).run()
+        assert to_indices(solved) == to_indices(solutions[0])
+
+
+def test_mapped_grid_without_solutions(tmp_path):
+    grid, _ = generate_and_solve(4, 5)
+    path = str(tmp_path / "maze.maze")
+    write_grid(path, grid)
+    with MappedGrid(path) as mapped:
+        assert mapped.solutions == []
+        assert mapped.header.seed is None
+
+
+@pytest.mark.parametrize("no_of_columns, no_of_rows", SIZES)
+def test_grid_to_bytes_round_trip_with_solutions(no_of_columns, no_of_rows):
+    grid, solutions = generate_and_solve(no_of_columns, no_of_rows)
+    read, header, read_solutions = grid_from_bytes(grid_to_bytes(grid, 9, "dfs", solutions))
+    assert read.walls == grid.walls
+    assert (header.no_of_columns, header.no_of_rows, header.seed) == (no_of_columns, no_of_rows, 9)
+    assert read_solutions == [to_indices(solution) for solution in solutions]
+
+
+@pytest.mark.parametrize("corruption", ["empty", "magic", "version", "truncated"])
+def test_invalid_files_raise_maze_file_error(tmp_path, corruption):
+    grid, _ = generate_and_solve(6, 6)
+    data = grid_to_bytes(grid)
+    data = {"empty": b"", "magic": b"ZAME" + data[4:], "version": data[:4] + b"\x09\x00" + data[6:],
+            "truncated": data[:HEADER.size + 3]}[corruption]
+    path = tmp_path / "maze.maze"
+    path.write_bytes(data)
+    no_of_open_files = open_file_count()
+    with pytest.raises(MazeFileError) as exception_info:
+        MappedGrid(str(path))
+    # The file and the mmap (holding its own descriptor) must be closed even while the traceback, which refers
+    # to the half-constructed grid, is still alive.
+    assert exception_info.traceback and open_file_count() == no_of_open_files
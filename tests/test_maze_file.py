@@ -0,0 +1,100 @@
+import io
+import random
+
+import pytest
+
+from grid_block.block import Block
+from grid_block.compact_grid import CompactGrid
+from maze_building.registry import GENERATING_ALGORITHMS
+from maze_solving.utils import get_wall_masks
+from maze_storage.maze_file import (HEADER, MazeHeader, MazeFileError, MazeReader, MazeWriter, pack_walls,
+                                    unpack_walls, read_grid, write_grid, write_rows, stream_maze_to_file)
+
+SIZES = [(1, 1), (1, 7), (7, 1), (3, 3), (10, 6)]
+
+
+def generate(no_of_columns, no_of_rows, seed=1, blocks=False):
+    grid = [Block(x, y) for y in range(no_of_rows) for x in range(no_of_columns)] if blocks \
+        else CompactGrid(no_of_columns, no_of_rows)
+    return GENERATING_ALGORITHMS["dfs"](grid, random.Random(seed)).run()
+
+
+def test_pack_walls_round_trip():
+    walls = bytearray(random.Random(0).randrange(16) for _ in range(64))
+    packed = pack_walls(walls)
+    assert len(packed) == 32
+    assert unpack_walls(packed) == walls
+
+
+@pytest.mark.parametrize("seed", [None, 0, -5, 2 ** 40])
+def test_header_round_trip(seed):
+    header = MazeHeader.from_bytes(MazeHeader(12, 34, seed, "kruskal").to_bytes())
+    assert (header.no_of_columns, header.no_of_rows, header.seed, header.generator) == (12, 34, seed, "kruskal")
+
+
+def test_header_rejects_invalid_data():
+    data = MazeHeader(3, 3).to_bytes()
+    with pytest.raises(MazeFileError):
+        MazeHeader.from_bytes(data[:-1])
+    with pytest.raises(MazeFileError):
+        MazeHeader.from_bytes(b"ZAME" + data[4:])
+    with pytest.raises(MazeFileError):
+        MazeHeader.from_bytes(data[:4] + b"\x09\x00" + data[6:])
+    with pytest.raises(ValueError):
+        MazeHeader(3, 3, generator="x" * 17).to_bytes()
+
+
+@pytest.mark.parametrize("blocks", [False, True])
+@pytest.mark.parametrize("no_of_columns, no_of_rows", SIZES)
+def test_write_grid_and_read_grid_round_trip(tmp_path, no_of_columns, no_of_rows, blocks):
+    grid = generate(no_of_columns, no_of_rows, blocks=blocks)
+    path = str(tmp_path / "maze.maze")
+    write_grid(path, grid, seed=7, generator="dfs")
+    read, header = read_grid(path)
+    assert read.walls == get_wall_masks(grid)
+    assert (header.no_of_columns, header.no_of_rows, header.seed, header.generator) == \
+        (no_of_columns, no_of_rows, 7, "dfs")
+
+
+def test_write_rows_stores_the_number_of_rows(tmp_path):
+    grid = generate(5, 4)
+    rows = [grid.walls[y * 5:(y + 1) * 5] for y in range(4)]
+    path = str(tmp_path / "maze.maze")
+    write_rows(path, iter(rows), 5)
+    with open(path, "rb") as file:
+        reader = MazeReader(file)
+        assert reader.header.no_of_rows == 4
+        assert list(reader.rows()) == rows
+
+
+def test_stream_maze_to_file_writes_a_perfect_maze(tmp_path):
+    path = str(tmp_path / "maze.maze")
+    stream_maze_to_file(path, 9, 6, seed=3)
+    grid, header = read_grid(path)
+    assert header.generator == "eller" and header.seed == 3
+    no_of_passages = sum(len(block.determine_valid_neighbours(grid)) for block in grid) // 2
+    assert no_of_passages == len(grid) - 1
+
+
+def test_writer_checks_the_number_of_rows():
+    with pytest.raises(ValueError, match="1 rows were written instead of 3"):
+        with MazeWriter(io.BytesIO(), 4, 3) as writer:
+            writer.write_row(bytes(4))
+
+
+def test_writer_keeps_the_original_exception():
+    with pytest.raises(KeyError):
+        with MazeWriter(io.BytesIO(), 4, 3) as writer:
+            writer.write_row(bytes(4))
+            raise KeyError("failed while writing")
+
+
+def test_reading_a_truncated_file_fails(tmp_path):
+    path = str(tmp_path / "maze.maze")
+    write_grid(path, generate(6, 6))
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:HEADER.size + 3])
+    with pytest.raises(MazeFileError):
+        read_grid(path)
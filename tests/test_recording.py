@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from grid_block.compact_grid import CompactGrid, VISITED, REVISITED
+from maze_building.braid import braid
+from maze_building.registry import GENERATING_ALGORITHMS
+from maze_solving.registry import SOLVING_ALGORITHMS
+from recording import Recorder, Player
+
+
+def snapshot(grid):
+    return bytes(grid.walls), bytes(grid.state)
+
+
+def record_in_steps(algorithm, grid, snapshots):
+    while not algorithm.step():
+        snapshots.append(snapshot(grid))
+    snapshots.append(snapshot(grid))
+
+
+def assert_every_step_replays(recording, snapshots):
+    assert len(recording) + 1 == len(snapshots)
+    player = Player(recording, CompactGrid(recording.no_of_columns, recording.no_of_rows))
+    for step in range(len(snapshots)):
+        player.seek(step)
+        assert snapshot(player.grid) == snapshots[step], step
+    for step in random.Random(0).sample(range(len(snapshots)), min(100, len(snapshots))):
+        player.seek(step)
+        assert snapshot(player.grid) == snapshots[step], step
+    player.seek(len(recording))
+    assert player.step_backward(len(recording))
+    assert snapshot(player.grid) == snapshots[0]
+
+
+@pytest.mark.parametrize("tracked", [False, True])
+@pytest.mark.parametrize("generator", sorted(GENERATING_ALGORITHMS))
+def test_seek_matches_snapshots_of_a_generator_and_a_solver_recorded_in_a_row(generator, tracked):
+    grid = CompactGrid(13, 9)
+    if tracked:
+        grid.track_changes()  # As GridRenderer does
+    recorder = Recorder(grid, keyframe_interval=40)
+    snapshots = [snapshot(grid)]
+    build_maze = recorder.attach(GENERATING_ALGORITHMS[generator](grid, random.Random(7)))
+    record_in_steps(build_maze, grid, snapshots)
+    if tracked:
+        grid.take_changes()
+    braid(grid, 0.5, random.Random(7))  # Changed between recorded steps too
+    # Changes made before the first step of the solver, e.g. resetting the grid, are recorded with that step.
+    solver = recorder.attach(SOLVING_ALGORITHMS["bfs"](grid, grid[0], grid[-1]))
+    record_in_steps(solver, grid, snapshots)
+    assert_every_step_replays(recorder.recording, snapshots)
+
+
+def test_recorded_changes_still_reach_other_consumers():
+    grid = GENERATING_ALGORITHMS["dfs"](CompactGrid(8, 6), random.Random(1)).run()
+    grid.track_changes()
+    solver = SOLVING_ALGORITHMS["bfs"](grid, grid[0], grid[-1])
+    grid.take_changes()
+    Recorder(grid).attach(solver)
+    solver.step(3)
+    assert grid.take_changes() == {index for index in range(len(grid)) if grid.state[index] & (VISITED | REVISITED)}
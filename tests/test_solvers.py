@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from grid_block.block import Block
+from grid_block.compact_grid import CompactGrid, WALL_N, WALL_E, WALL_S, WALL_W
+from maze_building.braid import braid, remove_random_walls
+from maze_building.registry import GENERATING_ALGORITHMS
+from maze_solving.graph import MazeGraph, ContractedGraphSearch
+from maze_solving.registry import SOLVING_ALGORITHMS
+
+SIZES = [(1, 1), (1, 9), (9, 1), (2, 7), (12, 8)]
+SOLVERS = ["jps", "bidirectional_bfs", "bidirectional_a_star", "contracted"]
+
+
+def open_grid(no_of_columns, no_of_rows):
+    """A grid without any inner walls."""
+    grid = CompactGrid(no_of_columns, no_of_rows)
+    for index in range(len(grid)):
+        x_index, y_index = index % no_of_columns, index // no_of_columns
+        grid.walls[index] = (WALL_N * (y_index == 0) | WALL_E * (x_index == no_of_columns - 1)
+                             | WALL_S * (y_index == no_of_rows - 1) | WALL_W * (x_index == 0))
+    return grid
+
+
+def make_mazes(no_of_columns, no_of_rows, seed):
+    """Perfect, braided and partly open mazes on a CompactGrid and on a list of Block objects and an open grid."""
+    mazes = [("open", open_grid(no_of_columns, no_of_rows))]
+    for kind in ("compact", "blocks"):
+        for variant in ("perfect", "braided", "rooms"):
+            rng = random.Random(seed)
+            grid = CompactGrid(no_of_columns, no_of_rows) if kind == "compact" \
+                else [Block(x, y) for y in range(no_of_rows) for x in range(no_of_columns)]
+            GENERATING_ALGORITHMS["dfs"](grid, rng).run()
+            if variant == "braided":
+                braid(grid, 1.0, rng)
+            elif variant == "rooms":
+                remove_random_walls(grid, len(grid), rng)
+            mazes.append((f"{kind} {variant}", grid))
+    return mazes
+
+
+def assert_valid_path(grid, path, start_block, goal_block):
+    assert path[0] == start_block and path[-1] == goal_block
+    for block, next_block in zip(path, path[1:]):
+        assert next_block in block.determine_valid_neighbours(grid)
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+@pytest.mark.parametrize("no_of_columns, no_of_rows", SIZES)
+def test_shortest_path_length_matches_bfs(name, no_of_columns, no_of_rows):
+    for seed in range(3):
+        for description, grid in make_mazes(no_of_columns, no_of_rows, seed):
+            rng = random.Random(seed)
+            for _ in range(5):
+                start_block, goal_block = grid[rng.randrange(len(grid))], grid[rng.randrange(len(grid))]
+                expected = SOLVING_ALGORITHMS["bfs"](grid, start_block, goal_block).run()
+                path = SOLVING_ALGORITHMS[name](grid, start_block, goal_block).run()
+                assert len(path) == len(expected), description
+                assert_valid_path(grid, path, start_block, goal_block)
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_stepping_gives_the_same_path_as_run(name):
+    for description, grid in make_mazes(10, 7, 1):
+        start_block, goal_block = grid[0], grid[-1]
+        expected = SOLVING_ALGORITHMS[name](grid, start_block, goal_block).run()
+        solver = SOLVING_ALGORITHMS[name](grid, start_block, goal_block)
+        while not solver.step(3):
+            pass
+        assert solver.result() == expected, description
+
+
+@pytest.mark.parametrize("no_of_columns, no_of_rows", SIZES)
+def test_maze_graph_reused_by_many_searches(no_of_columns, no_of_rows):
+    for description, grid in make_mazes(no_of_columns, no_of_rows, 2):
+        graph = MazeGraph(grid)
+        no_of_passages = sum(len(block.determine_valid_neighbours(grid)) for block in grid) // 2
+        assert graph.is_tree == (no_of_passages == len(grid) - 1), description  # Every maze here is connected
+        rng = random.Random(2)
+        for _ in range(10):
+            start_index, goal_index = rng.randrange(len(grid)), rng.randrange(len(grid))
+            expected = SOLVING_ALGORITHMS["bfs"](grid, grid[start_index], grid[goal_index]).run()
+            path = [grid[index] for index in graph.shortest_path(start_index, goal_index)]
+            assert len(path) == len(expected), description
+            assert_valid_path(grid, path, grid[start_index], grid[goal_index])
+            path = ContractedGraphSearch(grid, grid[start_index], grid[goal_index], graph).run()
+            assert len(path) == len(expected), description
@@ -0,0 +1,47 @@
+import stepping
+from stepping import FrameScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class TimedAlgorithm:
+    """Advances a fake clock by a fixed time per step and never finishes."""
+    def __init__(self, clock, step_seconds):
+        self.clock = clock
+        self.step_seconds = step_seconds
+
+    def step(self, n=1):
+        self.clock.now += n * self.step_seconds
+        return False
+
+
+def test_chunk_size_is_bounded_by_max_steps(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(stepping.time, "perf_counter", clock.perf_counter)
+    scheduler = FrameScheduler(budget_ms=8)
+    algorithm = TimedAlgorithm(clock, 1e-6)
+    for _ in range(600):
+        scheduler.advance(algorithm.step, 1)
+    assert scheduler.chunk_size == 1
+
+
+def test_frame_stays_within_budget_when_steps_per_frame_jump(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(stepping.time, "perf_counter", clock.perf_counter)
+    budget_ms = 8
+    scheduler = FrameScheduler(budget_ms=budget_ms)
+    algorithm = TimedAlgorithm(clock, 20e-6)
+    for _ in range(600):
+        scheduler.advance(algorithm.step, 1)
+    for _ in range(5):
+        start_time = clock.now
+        scheduler.advance(algorithm.step, 10 ** 9)
+        # The last chunk started before the deadline may take at most a quarter of the budget.
+        assert (clock.now - start_time) * 1000 <= budget_ms * 1.25
+        assert scheduler.steps_made < 10 ** 9